@@ -1,7 +1,10 @@
 # audio_controller.py
-import vlc
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from playback_engine import EnginePlayer, PlaybackEngine, get_default_engine
+from position_publisher import PositionPublisher
+from seek_scheduler import SeekScheduler
+
 class AudioController(QObject):
     """Handles all audio playback operations"""
     
@@ -12,25 +15,32 @@ class AudioController(QObject):
     volume_changed = pyqtSignal(int)    # Volume level 0-100
     track_ended = pyqtSignal()          # Track finished playing
     
-    def __init__(self):
+    def __init__(self, engine: PlaybackEngine | None = None, position_rate_hz: int = 20):
         super().__init__()
-        self.vlc_instance = vlc.Instance()
-        self.player = self.vlc_instance.media_player_new()
+        # Shares the process-wide engine so libvlc plugins are loaded once
+        self.engine = engine if engine is not None else get_default_engine()
+        self.player: EnginePlayer | None = self.engine.create_player()
         self.current_file = None
+        # Coalesces engine time callbacks into position_changed at a fixed rate;
+        # call position_publisher.watch_window(window) to pause it while hidden
+        self.position_publisher = PositionPublisher(position_rate_hz, self)
+        self.position_publisher.position_changed.connect(self.position_changed)
+        # Slider scrubs seek at most once per settle window; the target shows immediately
+        self.seek_scheduler = SeekScheduler(self._apply_seek, parent=self)
+        self.seek_scheduler.preview_changed.connect(self.position_publisher.publish_now)
         self._setup_event_manager()
     
     def _setup_event_manager(self):
-        """Setup VLC event callbacks"""
-        event_manager = self.player.event_manager()
-        event_manager.event_attach(vlc.EventType.MediaPlayerTimeChanged, self._on_time_changed)
-        event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_track_ended)
-        # Add other event handlers...
+        """Setup engine event callbacks"""
+        self.player.on_time = self._on_time_changed
+        self.player.on_end = self._on_track_ended
+        self.player.on_length = self.length_changed.emit
     
     def load_file(self, file_path):
         """Load an audio file for playback"""
         try:
-            media = self.vlc_instance.media_new(file_path)
-            self.player.set_media(media)
+            self.seek_scheduler.cancel()
+            self.player.load(file_path)
             self.current_file = file_path
             return True
         except Exception as e:
@@ -57,8 +67,11 @@ class AudioController(QObject):
     def set_position(self, position_ms):
         """Set playback position in milliseconds"""
         if self.get_length() > 0:
-            position = position_ms / self.get_length()
-            self.player.set_position(position)
+            self.seek_scheduler.request(position_ms)
+
+    def _apply_seek(self, position_ms):
+        if self.player is not None:
+            self.player.set_time(position_ms)
     
     def get_position(self):
         """Get current position in milliseconds"""
@@ -70,54 +83,42 @@ class AudioController(QObject):
     
     def set_volume(self, volume):
         """Set volume (0-100)"""
-        self.player.audio_set_volume(volume)
+        self.player.set_volume(volume)
         self.volume_changed.emit(volume)
     
     def get_volume(self):
         """Get current volume (0-100)"""
-        return self.player.audio_get_volume()
+        return self.player.get_volume()
     
     def is_playing(self):
         """Check if audio is currently playing"""
         return self.player.is_playing()
     
-    def _on_time_changed(self, event):
-        """Handle VLC time change events"""
-        self.position_changed.emit(self.get_position())
+    def _on_time_changed(self, time_ms):
+        """Handle engine time change events (engine thread)"""
+        # Stale pre-seek times would yank the slider back during a scrub
+        if not self.seek_scheduler.busy:
+            self.position_publisher.push(time_ms)
     
-    def _on_track_ended(self, event):
+    def _on_track_ended(self):
         """Handle track end events"""
         self.track_ended.emit()
     
     def cleanup(self):
-        """Clean up resources"""
-        self.stop()
-        self.player.release()
-        self.vlc_instance.release()
-
-    def cleanup(self):
-        """Proper VLC cleanup to prevent callback errors"""
+        """Release the player; safe to call more than once"""
         try:
-            if hasattr(self, 'player') and self.player:
-                # Stop playback first
-                self.player.stop()
-                
-                # Detach all event callbacks
-                event_manager = self.player.event_manager()
-                if event_manager:
-                    # Remove all callbacks to prevent cleanup errors
-                    event_manager.event_detach(vlc.EventType.MediaPlayerEndReached)
-                    event_manager.event_detach(vlc.EventType.MediaPlayerTimeChanged)
-                    # Add any other events you're listening to
-                
-                # Release the media player
+            if getattr(self, 'position_publisher', None) is not None:
+                self.position_publisher.stop()
+                self.seek_scheduler.cancel()
+                # __del__ calls cleanup again after Qt may have deleted the timers
+                self.position_publisher = None
+            if getattr(self, 'player', None) is not None:
+                # Stops playback and detaches callbacks before releasing
                 self.player.release()
                 self.player = None
-                
         except Exception as e:
-            print(f"VLC cleanup error (non-fatal): {e}")
+            print(f"Player cleanup error (non-fatal): {e}")
 
     def __del__(self):
         """Destructor to ensure cleanup"""
         self.cleanup()
-
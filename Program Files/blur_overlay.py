@@ -0,0 +1,93 @@
+# blur_overlay.py - Blurred snapshot of the main window behind modal popups
+from PyQt6.QtCore import QEvent, QPoint, Qt
+from PyQt6.QtGui import QImage, QPainter, QPixmap, QRegion
+from PyQt6.QtWidgets import QWidget
+
+from PIL import Image, ImageFilter
+
+
+class WindowBlurOverlay(QWidget):
+    """Covers a window with a blurred picture of itself while a popup is open.
+
+    The window is rendered once, straight into an image ``downscale`` times
+    smaller than itself, so a 4K window costs little more than a small one.
+    That image is box-blurred and stretched back over the window with
+    bilinear filtering at paint time, which hides any remaining detail. The
+    snapshot is kept until the window resizes or its owner calls invalidate()
+    on a real content change (a new track, a new color). Ordinary repaints,
+    such as the playlist's pulse animation, keep it, so showing the overlay
+    again over an unchanged window renders nothing.
+    """
+
+    def __init__(self, window: QWidget, downscale: int = 8, radius: int = 2, passes: int = 3):
+        super().__init__(window)
+        self.window_widget = window
+        self.downscale = max(1, downscale)
+        self.radius = radius
+        self.passes = passes
+        self._snapshot: QPixmap | None = None
+        self._dirty = True
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        # Fully covers the window, so nothing beneath needs repainting
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.hide()
+        window.installEventFilter(self)
+
+    def invalidate(self):
+        """Drop the cached snapshot, e.g. after recoloring the window under a popup."""
+        self._dirty = True
+
+    def show_over(self):
+        """Cover the window, re-taking the snapshot only if the window changed."""
+        if self._dirty or self._snapshot is None:
+            self._snapshot = self._render_blur()
+            self._dirty = False
+        self.setGeometry(self.window_widget.rect())
+        self.show()
+        self.raise_()
+
+    def refresh(self):
+        """Re-take the snapshot under an open overlay."""
+        self.invalidate()
+        if self.isVisible():
+            # Hide first so the snapshot shows the window, not the overlay
+            self.hide()
+            self.show_over()
+
+    def _render_blur(self) -> QPixmap:
+        window = self.window_widget
+        w = max(1, window.width() // self.downscale)
+        h = max(1, window.height() // self.downscale)
+        small = QImage(w, h, QImage.Format.Format_RGB888)
+        small.fill(Qt.GlobalColor.black)
+        painter = QPainter(small)
+        painter.scale(w / max(1, window.width()), h / max(1, window.height()))
+        window.render(painter, QPoint(), QRegion(window.rect()),
+                      QWidget.RenderFlag.DrawWindowBackground | QWidget.RenderFlag.DrawChildren)
+        painter.end()
+
+        ptr = small.constBits()
+        ptr.setsize(small.sizeInBytes())
+        image = Image.frombuffer("RGB", (w, h), bytes(ptr), "raw", "RGB", small.bytesPerLine(), 1)
+        # Repeated box passes approximate a Gaussian at a fraction of the cost
+        for _ in range(self.passes):
+            image = image.filter(ImageFilter.BoxBlur(self.radius))
+        data = image.tobytes()
+        return QPixmap.fromImage(QImage(data, w, h, w * 3, QImage.Format.Format_RGB888).copy())
+
+    def paintEvent(self, event):
+        if self._snapshot is None:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(self.rect(), self._snapshot)
+        painter.end()
+
+    def eventFilter(self, obj, event):
+        if obj is self.window_widget:
+            kind = event.type()
+            if kind == QEvent.Type.Resize:
+                self._dirty = True
+                if self.isVisible():
+                    self.setGeometry(self.window_widget.rect())
+        return False
@@ -173,6 +173,19 @@ class ColorDialogManager:
             # If turning on and we have album art, immediately apply it
             if not current and hasattr(self.parent, 'album_original_image') and self.parent.album_original_image is not None:
                 try:
+                    window_blur = getattr(self.parent, 'window_blur', None)
+                    if window_blur is not None and window_blur.isVisible():
+                        self.parent.set_album_art(self.parent.album_original_image)
+                        # Re-take the snapshot over the new colors; the overlay itself stays put
+                        window_blur.refresh()
+                        blur_overlay = getattr(self.parent, '_blur_overlay', None)
+                        if blur_overlay:
+                            blur_overlay.raise_()
+                        return
+
+                    if window_blur is not None:
+                        window_blur.invalidate()
+
                     # IMPORTANT: Temporarily store blur state to restore it after color update
                     dialog_blur_active = hasattr(self.parent, '_blur_overlay_widget') and self.parent._blur_overlay_widget is not None
                     blur_overlay_widget = getattr(self.parent, '_blur_overlay_widget', None)
@@ -353,6 +366,11 @@ class ColorDialogManager:
         # Force repaint of all widgets
         self.parent.repaint()
 
+        # The popup blur snapshot still shows the old colors
+        window_blur = getattr(self.parent, 'window_blur', None)
+        if window_blur is not None:
+            window_blur.invalidate()
+
         # Update Done button color if it exists in the current dialog
         if hasattr(self.parent, '_current_color_dialog_done_btn'):
             self.parent._current_color_dialog_done_btn()
@@ -10,6 +10,7 @@ class TintedAlbumArt(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._pixmap = None
+        self._scaled = None
         self.setGeometry(0, 0, 220, 220)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
 
@@ -19,6 +20,7 @@ class TintedAlbumArt(QWidget):
 
     def setPixmap(self, pixmap):
         self._pixmap = pixmap
+        self._scaled = None
         self.update()
 
     def paintEvent(self, event):
@@ -28,8 +30,15 @@ class TintedAlbumArt(QWidget):
         # No clipping path applied
         
         if self._pixmap:
-            scaled = self._pixmap.scaled(220, 220, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            painter.drawPixmap(0, 0, scaled)
+            # Art decoded at 220 px is drawn as is; anything else is scaled once, not per paint
+            if self._scaled is None:
+                if self._pixmap.deviceIndependentSize().toSize() == QSize(220, 220):
+                    self._scaled = self._pixmap
+                else:
+                    dpr = self._pixmap.devicePixelRatio()
+                    self._scaled = self._pixmap.scaled(round(220 * dpr), round(220 * dpr), Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                    self._scaled.setDevicePixelRatio(dpr)
+            painter.drawPixmap(0, 0, self._scaled)
         else:
             painter.fillRect(0, 0, 220, 220, Qt.GlobalColor.darkGray)
 
@@ -0,0 +1,278 @@
+# playback_engine.py - Playback backends shared by the audio and player controllers
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+try:
+    import vlc
+except ImportError:  # headless environments can still use FakePlaybackEngine
+    vlc = None
+
+
+class EnginePlayer(ABC):
+    """One playback stream. Controllers assign the on_* callbacks.
+
+    Callbacks may fire on a backend thread (libvlc's event thread for
+    VlcPlaybackEngine); they must not call back into the same player.
+    """
+
+    def __init__(self) -> None:
+        self.on_end: Callable[[], None] = lambda: None
+        self.on_time: Callable[[int], None] = lambda ms: None
+        self.on_length: Callable[[int], None] = lambda ms: None
+        self.on_playing: Callable[[], None] = lambda: None
+
+    @abstractmethod
+    def load(self, path: str, parse: bool = False) -> None:
+        """Open ``path`` as the current media; ``parse`` probes it up front."""
+
+    @abstractmethod
+    def play(self) -> int:
+        """Start or resume playback; returns 0 on success like libvlc."""
+
+    @abstractmethod
+    def pause(self) -> None:
+        ...
+
+    @abstractmethod
+    def stop(self) -> None:
+        ...
+
+    @abstractmethod
+    def is_playing(self) -> bool:
+        ...
+
+    @abstractmethod
+    def get_time(self) -> int:
+        ...
+
+    @abstractmethod
+    def set_time(self, ms: int) -> None:
+        ...
+
+    @abstractmethod
+    def get_length(self) -> int:
+        ...
+
+    @abstractmethod
+    def set_volume(self, volume: int) -> None:
+        ...
+
+    @abstractmethod
+    def get_volume(self) -> int:
+        ...
+
+    @abstractmethod
+    def release(self) -> None:
+        ...
+
+
+class PlaybackEngine(ABC):
+    """Creates players; one engine is shared by every controller in the app."""
+
+    @abstractmethod
+    def create_player(self) -> EnginePlayer:
+        ...
+
+    @abstractmethod
+    def release(self) -> None:
+        ...
+
+
+class VlcPlayer(EnginePlayer):
+    """EnginePlayer backed by a libvlc media player."""
+
+    def __init__(self, instance) -> None:
+        super().__init__()
+        self._instance = instance
+        self._player = instance.media_player_new()
+        self._events = self._player.event_manager()
+        self._events.event_attach(vlc.EventType.MediaPlayerEndReached, lambda e: self.on_end())
+        self._events.event_attach(vlc.EventType.MediaPlayerTimeChanged, lambda e: self.on_time(e.u.new_time))
+        self._events.event_attach(vlc.EventType.MediaPlayerLengthChanged, lambda e: self.on_length(e.u.new_length))
+        self._events.event_attach(vlc.EventType.MediaPlayerPlaying, lambda e: self.on_playing())
+
+    def load(self, path: str, parse: bool = False) -> None:
+        media = self._instance.media_new(path)
+        if parse:
+            media.parse_with_options(vlc.MediaParseFlag.local, 0)
+        self._player.set_media(media)
+
+    def play(self) -> int:
+        return self._player.play()
+
+    def pause(self) -> None:
+        self._player.pause()
+
+    def stop(self) -> None:
+        self._player.stop()
+
+    def is_playing(self) -> bool:
+        return bool(self._player.is_playing())
+
+    def get_time(self) -> int:
+        return self._player.get_time()
+
+    def set_time(self, ms: int) -> None:
+        self._player.set_time(int(ms))
+
+    def get_length(self) -> int:
+        return self._player.get_length()
+
+    def set_volume(self, volume: int) -> None:
+        self._player.audio_set_volume(int(volume))
+
+    def get_volume(self) -> int:
+        return self._player.audio_get_volume()
+
+    def release(self) -> None:
+        if self._player is None:
+            return
+        self._player.stop()
+        # Detach callbacks first so late events cannot reach a dead controller
+        for event_type in (vlc.EventType.MediaPlayerEndReached, vlc.EventType.MediaPlayerTimeChanged,
+                           vlc.EventType.MediaPlayerLengthChanged, vlc.EventType.MediaPlayerPlaying):
+            self._events.event_detach(event_type)
+        self._player.release()
+        self._player = None
+
+
+class VlcPlaybackEngine(PlaybackEngine):
+    """libvlc backend; plugins are loaded once per process."""
+
+    def __init__(self) -> None:
+        if vlc is None:
+            raise RuntimeError("python-vlc is not installed")
+        self.instance = vlc.Instance()
+
+    def create_player(self) -> EnginePlayer:
+        return VlcPlayer(self.instance)
+
+    def release(self) -> None:
+        if self.instance is not None:
+            self.instance.release()
+            self.instance = None
+
+
+class FakePlayer(EnginePlayer):
+    """Deterministic in-process player driven by FakePlaybackEngine.advance()."""
+
+    def __init__(self, engine: "FakePlaybackEngine") -> None:
+        super().__init__()
+        self._engine = engine
+        self.path: Optional[str] = None
+        self._time = 0
+        self._length = 0
+        self._playing = False
+        self._length_reported = False
+        self._volume = 100
+
+    def load(self, path: str, parse: bool = False) -> None:
+        self.path = path
+        self._time = 0
+        self._length = self._engine.length_for(path)
+        self._playing = False
+        self._length_reported = False
+
+    def play(self) -> int:
+        if self.path is None:
+            return -1
+        if self._time >= self._length:
+            self._time = 0
+        self._playing = True
+        if not self._length_reported:
+            self._length_reported = True
+            self.on_length(self._length)
+        self.on_playing()
+        return 0
+
+    def pause(self) -> None:
+        # libvlc's pause() toggles
+        if self._playing:
+            self._playing = False
+        elif self.path is not None:
+            self._playing = True
+
+    def stop(self) -> None:
+        self._playing = False
+        self._time = 0
+
+    def is_playing(self) -> bool:
+        return self._playing
+
+    def get_time(self) -> int:
+        return self._time if self.path is not None else -1
+
+    def set_time(self, ms: int) -> None:
+        if self.path is not None:
+            self._time = max(0, min(int(ms), self._length))
+
+    def get_length(self) -> int:
+        return self._length if self._length_reported else 0
+
+    def set_volume(self, volume: int) -> None:
+        self._volume = int(volume)
+
+    def get_volume(self) -> int:
+        return self._volume
+
+    def release(self) -> None:
+        self._playing = False
+        if self in self._engine.players:
+            self._engine.players.remove(self)
+
+    def _advance(self, ms: int) -> None:
+        if not self._playing:
+            return
+        self._time = min(self._time + ms, self._length)
+        if self._time >= self._length:
+            self._playing = False
+            self.on_end()
+        else:
+            self.on_time(self._time)
+
+
+class FakePlaybackEngine(PlaybackEngine):
+    """Headless backend with a simulated clock, for benchmarks and soak tests.
+
+    Nothing happens until advance() is called; callbacks then fire
+    synchronously on the calling thread, so runs are fully reproducible.
+    """
+
+    def __init__(self, default_length_ms: int = 180000, lengths: Dict[str, int] | None = None,
+                 tick_ms: int = 250) -> None:
+        self.default_length_ms = default_length_ms
+        self.lengths = dict(lengths or {})
+        self.tick_ms = tick_ms
+        self.now_ms = 0
+        self.players: List[FakePlayer] = []
+
+    def length_for(self, path: str) -> int:
+        return self.lengths.get(path, self.default_length_ms)
+
+    def create_player(self) -> EnginePlayer:
+        player = FakePlayer(self)
+        self.players.append(player)
+        return player
+
+    def advance(self, ms: int) -> None:
+        """Move simulated time forward in tick_ms steps."""
+        while ms > 0:
+            step = min(ms, self.tick_ms)
+            self.now_ms += step
+            for player in list(self.players):
+                player._advance(step)
+            ms -= step
+
+    def release(self) -> None:
+        self.players.clear()
+
+
+_default_engine: PlaybackEngine | None = None
+
+
+def get_default_engine() -> PlaybackEngine:
+    """Return the process-wide libvlc engine, creating it on first use."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = VlcPlaybackEngine()
+    return _default_engine
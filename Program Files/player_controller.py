@@ -1,46 +1,214 @@
-import vlc
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
-import random
+from PyQt6.QtCore import QModelIndex, QObject, pyqtSignal
+from functools import partial
 import os
+import time
+
+from playback_engine import EnginePlayer, PlaybackEngine, get_default_engine
+from seek_scheduler import SeekScheduler
+from shuffle_order import ShuffleOrder
+from track_store import (Playlist, TrackStore, move_blocks, normalize_ranges, row_after_insert, row_after_move,
+                         row_after_remove, row_after_remove_ranges, row_ranges)
+from volume_ramp import RampScheduler
+from workers.track_prefetcher import TrackPrefetcher
 
 class PlayerController(QObject):
-    """Controls playback and playlist state using VLC."""
+    """Controls playback and playlist state on a PlaybackEngine (libvlc by default)."""
     song_ended_signal: pyqtSignal = pyqtSignal()
     length_known_signal: pyqtSignal = pyqtSignal(int)
+    track_changed_signal: pyqtSignal = pyqtSignal(int)  # index started by gapless handover or crossfade
+    current_removed_signal: pyqtSignal = pyqtSignal()  # the playing track was removed and playback stopped
+    _time_changed_signal: pyqtSignal = pyqtSignal(int)
+    _gapless_switch_signal: pyqtSignal = pyqtSignal()
 
-    def __init__(self) -> None:
-        """Initialize the player controller and VLC instance."""
+    def __init__(self, engine: PlaybackEngine | None = None) -> None:
+        """Initialize the player controller on ``engine`` (the shared libvlc engine by default)."""
         super().__init__()
-        self.vlc_instance = vlc.Instance()
-        self.player = self.vlc_instance.media_player_new()
-        event_manager = self.player.event_manager()
-        event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._handle_song_end)
-        event_manager.event_attach(vlc.EventType.MediaPlayerLengthChanged, self._on_length_known)
-        self.media = None
-        self.playlist: list[str] = []
+        self.engine = engine if engine is not None else get_default_engine()
+        self.player: EnginePlayer = self.engine.create_player()
+        # Second player that holds the pre-opened next track (gapless or crossfade)
+        self._next_player: EnginePlayer = self.engine.create_player()
+        for player in (self.player, self._next_player):
+            # Bound per player so events from the inactive one can be ignored
+            player.on_end = partial(self._handle_song_end, player)
+            player.on_length = partial(self._on_length_known, player)
+            player.on_time = partial(self._on_time_changed, player)
+            player.on_playing = self._on_playing
+        self._time_changed_signal.connect(self._check_preload)
+        self._gapless_switch_signal.connect(self._switch_to_preloaded)
+        # Coalesces slider scrubs; connect seek_scheduler.preview_changed for the target time
+        self.seek_scheduler = SeekScheduler(lambda ms: self.player.set_time(ms), parent=self)
+        self.gapless: bool = False
+        self.preload_ms: int = 5000
+        self._preloaded_index: int | None = None
+        self.crossfade_ms: int = 0
+        # Player fading out during a crossfade; cleared by the ramp thread when done
+        self._fade_out_player: EnginePlayer | None = None
+        self._ramps = RampScheduler()
+        self._ended_at: float | None = None
+        self.last_track_gap_ms: float | None = None
+        # Paths are held once in the TrackStore; the playlist is a packed array of track IDs
+        self.track_store = TrackStore()
+        self.playlist = Playlist(self.track_store)
+        # Optional PlaylistModel sharing self.playlist; edits go through it so views get row notifications
+        self.playlist_model = None
         self.current_index: int = -1
         self.shuffle: bool = False
         self.repeat_mode: str = "off"
+        # Built lazily when shuffle is on; _shuffle_seen is the playlist length it has absorbed
+        self._shuffle_order: ShuffleOrder | None = None
+        self._shuffle_seen: int = 0
+        # Warms the next few tracks in play order into the OS page cache
+        self.prefetch_count: int = 3
+        self.prefetcher = TrackPrefetcher()
+        # Optional AlbumArtLoader; covers for the next tracks are decoded ahead of time
+        self.art_loader = None
+        # Optional MetadataManager; the current and next tracks are parsed first
+        self.metadata_manager = None
         self.duration_ms: int = 0
         self.volume: int = 70
 
     def set_playlist(self, files: list[str]) -> None:
         """Set the playlist and reset the current index."""
-        self.playlist = files
-        self.current_index = 0 if files else -1
+        # A pending handover would start a track from the old list
+        self._cancel_crossfade()
+        self._discard_preload()
+        self.playlist.replace(files)
+        self.current_index = 0 if self.playlist else -1
+        self._shuffle_order = None
+        if self.playlist_model is not None:
+            self.playlist_model.reset()
+
+    def attach_model(self, model) -> None:
+        """Bind a PlaylistModel to this controller's playlist and route edits through it."""
+        self.playlist_model = model
+        model.set_playlist(self.playlist)
+
+    def move_rows(self, rows, dest: int) -> bool:
+        """Move rows (kept in order) to before ``dest``; O(k) bookkeeping per moved block."""
+        rows = [r for r in rows if 0 <= r < len(self.playlist)]
+        dest = max(0, min(dest, len(self.playlist)))
+        steps = move_blocks(rows, dest)
+        for start, count, target in steps:
+            model = self.playlist_model
+            if model is None or not model.moveRows(QModelIndex(), start, count, QModelIndex(), target):
+                self.playlist.move(start, count, target)
+                if model is not None:
+                    model.reset()  # rows beyond the loaded page; rare
+            self.current_index = row_after_move(self.current_index, start, count, target)
+            if self._preloaded_index is not None:
+                self._preloaded_index = row_after_move(self._preloaded_index, start, count, target)
+        if steps:
+            self._schedule_prefetch()
+        return bool(steps)
+
+    def insert_tracks(self, row: int, paths) -> int:
+        """Insert tracks before ``row`` (clamped to the end); returns the count inserted."""
+        row = max(0, min(row, len(self.playlist)))
+        if self._shuffle_order is not None:
+            # Absorb tracks appended since the last sync, or _shuffle_seen skips them
+            self._sync_shuffle()
+        if self.playlist_model is not None:
+            count = self.playlist_model.insert_tracks(row, paths)
+        else:
+            count = self.playlist.insert(row, paths)
+        if not count:
+            return 0
+        self.current_index = row_after_insert(self.current_index, row, count)
+        if self._preloaded_index is not None:
+            self._preloaded_index = row_after_insert(self._preloaded_index, row, count)
+        if self._shuffle_order is not None:
+            for track_id in self.playlist.ids[row:row + count]:
+                self._shuffle_order.add(track_id)
+            self._shuffle_seen += count
+        self._schedule_prefetch()
+        return count
+
+    def remove_rows(self, start: int, count: int) -> bool:
+        """Remove a range of rows; stops playback if the current track is among them."""
+        count = min(count, len(self.playlist) - start)
+        if start < 0 or count <= 0:
+            return False
+        if self._shuffle_order is not None:
+            self._sync_shuffle()
+            removed_ids = self.playlist.ids[start:start + count]
+        if self.playlist_model is not None:
+            self.playlist_model.remove_rows(start, count)
+        else:
+            self.playlist.remove(start, count)
+        if self._shuffle_order is not None:
+            self._shuffle_seen -= count
+            self._drop_from_shuffle(removed_ids)
+        if self._preloaded_index is not None:
+            self._preloaded_index = row_after_remove(self._preloaded_index, start, count)
+            if self._preloaded_index < 0:
+                self._discard_preload()
+        current = row_after_remove(self.current_index, start, count)
+        if current < 0 and self.current_index >= 0:
+            self._stop_removed_current()
+        else:
+            self.current_index = current
+        self._schedule_prefetch()
+        return True
+
+    def remove_ranges(self, ranges) -> int:
+        """Remove many (start, count) ranges in one linear pass; returns the rows removed.
+
+        The current track keeps playing at its new row, or playback stops if
+        it was removed.
+        """
+        ranges = normalize_ranges(ranges, len(self.playlist))
+        if not ranges:
+            return 0
+        if self._shuffle_order is not None:
+            self._sync_shuffle()
+            ids = self.playlist.ids
+            removed_ids = [k for start, count in ranges for k in ids[start:start + count]]
+        if self.playlist_model is not None:
+            removed = self.playlist_model.remove_ranges(ranges)
+        else:
+            removed = self.playlist.remove_ranges(ranges)
+        if self._shuffle_order is not None:
+            self._shuffle_seen -= removed
+            self._drop_from_shuffle(removed_ids)
+        if self._preloaded_index is not None:
+            self._preloaded_index = row_after_remove_ranges(self._preloaded_index, ranges)
+            if self._preloaded_index < 0:
+                self._discard_preload()
+        current = row_after_remove_ranges(self.current_index, ranges)
+        if current < 0 and self.current_index >= 0:
+            self._stop_removed_current()
+        else:
+            self.current_index = current
+        self._schedule_prefetch()
+        return removed
+
+    def remove_tracks(self, rows) -> int:
+        """Remove the given rows, e.g. a selection, in one pass."""
+        return self.remove_ranges(row_ranges(rows))
+
+    def _stop_removed_current(self) -> None:
+        self.stop()
+        self._discard_preload()
+        self.seek_scheduler.cancel()
+        self.current_index = -1
+        self.duration_ms = 0
+        self.current_removed_signal.emit()
 
     def play_song(self, index: int) -> None:
         """Play the song at the given index."""
         if not (0 <= index < len(self.playlist)):
             return
         self.current_index = index
-        path = self.playlist[index]
-        if self.vlc_instance is not None:
-            self.media = self.vlc_instance.media_new(path)
-            self.player.set_media(self.media)
-            self.player.play()
-            self.player.audio_set_volume(self.volume)
-            QTimer.singleShot(300, self.check_duration)
+        self._shuffle_jump(index)
+        self._cancel_crossfade()
+        self._discard_preload()
+        self.seek_scheduler.cancel()
+        self.player.load(self.playlist[index])
+        # Seed first: an engine may report the exact length as soon as play() starts
+        self._seed_duration(index)
+        self.player.play()
+        self.player.set_volume(self.volume)
+        self._schedule_prefetch()
 
     def play(self) -> None:
         """Resume playback."""
@@ -48,29 +216,124 @@ class PlayerController(QObject):
 
     def pause(self) -> None:
         """Pause playback."""
+        self._cancel_crossfade()
         self.player.pause()
 
     def stop(self) -> None:
         """Stop playback."""
+        self._cancel_crossfade()
         self.player.stop()
 
     def is_playing(self) -> bool:
         """Return True if the player is currently playing."""
         return self.player.is_playing()
 
-    def play_next(self) -> None:
-        """Play the next song in the playlist, respecting shuffle and repeat."""
+    def _next_index(self) -> int | None:
+        """Return the index play_next() would pick, reusing a gapless preload."""
         if not self.playlist:
-            return
-        next_index = random.randint(0, len(self.playlist) - 1) if self.shuffle else self.current_index + 1
+            return None
+        if self._preloaded_index is not None:
+            return self._preloaded_index
+        if self.shuffle:
+            upcoming = self._shuffle_rows(1)
+            if not upcoming and self.repeat_mode == "all":
+                self._sync_shuffle().new_cycle()
+                upcoming = self._shuffle_rows(1)
+            return upcoming[0] if upcoming else None
+        next_index = self.current_index + 1
         if next_index >= len(self.playlist):
             next_index = 0 if self.repeat_mode == "all" else len(self.playlist) - 1
-        self.play_song(next_index)
+        return next_index
+
+    def play_next(self) -> None:
+        """Play the next song in the playlist, respecting shuffle and repeat."""
+        next_index = self._next_index()
+        if next_index is not None:
+            self.play_song(next_index)
+
+    def _sync_shuffle(self) -> ShuffleOrder:
+        """Return the shuffle order, building it or absorbing appended tracks as needed."""
+        ids = self.playlist.ids
+        if self._shuffle_order is None:
+            self._shuffle_order = ShuffleOrder(ids)
+            current_id = self.get_current_track_id()
+            if current_id is not None:
+                self._shuffle_order.jump(current_id)
+        elif len(ids) > self._shuffle_seen:
+            for track_id in ids[self._shuffle_seen:]:
+                self._shuffle_order.add(track_id)
+        self._shuffle_seen = len(ids)
+        return self._shuffle_order
+
+    def _drop_from_shuffle(self, track_ids) -> None:
+        """Remove deleted tracks from the shuffle order, keeping any still listed elsewhere."""
+        has_track = self.playlist.has_track
+        for track_id in track_ids:
+            if not has_track(track_id):
+                self._shuffle_order.remove(track_id)
+
+    def _shuffle_rows(self, count: int) -> list[int]:
+        """Rows of the next ``count`` shuffle picks; drops picks no longer in the playlist."""
+        order = self._sync_shuffle()
+        while True:
+            keys = order.peek(count)
+            rows = [self.playlist.row_of(k) for k in keys]
+            if -1 not in rows:
+                return rows
+            for key, row in zip(keys, rows):
+                if row < 0:
+                    order.remove(key)
+
+    def _shuffle_jump(self, index: int) -> None:
+        """Record that ``index`` is now playing in the shuffle order."""
+        if self.shuffle:
+            self._sync_shuffle().jump(self.playlist.track_id(index))
+
+    def upcoming_indices(self, count: int) -> list[int]:
+        """Indices play_next() will visit after the current track, in order."""
+        if not self.playlist or count <= 0 or self.repeat_mode == "one":
+            return []
+        if self.shuffle:
+            # A shuffle preload is always the next pick in the order
+            return self._shuffle_rows(count)
+        upcoming = []
+        if self._preloaded_index is not None:
+            upcoming.append(self._preloaded_index)
+        index = upcoming[-1] if upcoming else self.current_index
+        while len(upcoming) < count:
+            index += 1
+            if index >= len(self.playlist):
+                if self.repeat_mode != "all":
+                    break
+                index = 0
+            upcoming.append(index)
+        return upcoming
+
+    def _schedule_prefetch(self) -> None:
+        paths = [self.playlist[i] for i in self.upcoming_indices(self.prefetch_count)]
+        self.prefetcher.prefetch(paths)
+        if self.art_loader is not None:
+            self.art_loader.prefetch(paths[:1])
+        if self.metadata_manager is not None:
+            self.metadata_manager.set_now_playing(self.get_current_song_path())
+            self.metadata_manager.set_next_up(paths)
 
     def play_previous(self) -> None:
-        """Play the previous song in the playlist."""
+        """Play the previous song in the playlist, or in the shuffle history."""
         if not self.playlist:
             return
+        if self.shuffle:
+            order = self._sync_shuffle()
+            # At the start of the history the current track restarts
+            prev_index = max(self.current_index, 0)
+            while (key := order.previous()) is not None:
+                row = self.playlist.row_of(key)
+                if row >= 0:
+                    prev_index = row
+                    break
+                order.remove(key)
+            self.play_song(prev_index)
+            return
         prev_index = self.current_index - 1
         if prev_index < 0:
             prev_index = len(self.playlist) - 1 if self.repeat_mode == "all" else 0
@@ -79,32 +342,141 @@ class PlayerController(QObject):
     def set_shuffle(self, shuffle: bool) -> None:
         """Enable or disable shuffle mode."""
         self.shuffle = shuffle
+        self._shuffle_order = None
+        self._discard_preload()
+        self._schedule_prefetch()
 
     def set_repeat_mode(self, mode: str) -> None:
         """Set the repeat mode (off, one, all)."""
         self.repeat_mode = mode
+        self._discard_preload()
+        self._schedule_prefetch()
+
+    def set_gapless(self, enabled: bool) -> None:
+        """Enable or disable gapless handover to a pre-opened next track."""
+        self.gapless = enabled
+        if not enabled and self.crossfade_ms <= 0:
+            self._discard_preload()
+
+    def set_crossfade(self, ms: int) -> None:
+        """Set the crossfade length in ms (0 disables, at most 12 s)."""
+        self.crossfade_ms = max(0, min(12000, int(ms)))
+        if self.crossfade_ms <= 0 and not self.gapless:
+            self._discard_preload()
+
+    def _preload_lead_ms(self) -> int:
+        return self.preload_ms + self.crossfade_ms
+
+    def _check_preload(self, time_ms: int) -> None:
+        """Pre-open the next track near the end of this one; start a crossfade when due."""
+        if self._fade_out_player is not None or self.duration_ms <= 0:
+            return
+        remaining = self.duration_ms - time_ms
+        if self._preloaded_index is None:
+            if not (self.gapless or self.crossfade_ms > 0) or remaining > self._preload_lead_ms():
+                return
+            if self.repeat_mode == "one":
+                next_index = self.current_index
+            else:
+                # Nothing follows the last track unless repeat is on; let it end
+                upcoming = self.upcoming_indices(1)
+                if upcoming:
+                    next_index = upcoming[0]
+                elif self.repeat_mode == "all":
+                    next_index = self._next_index()  # a finished shuffle cycle starts over
+                else:
+                    return
+            if next_index is None:
+                return
+            # Do the open + demux probe now instead of at the track boundary
+            self._next_player.load(self.playlist[next_index], parse=True)
+            self._preloaded_index = next_index
+        if self.crossfade_ms > 0 and remaining <= self.crossfade_ms:
+            self._start_crossfade(remaining)
+
+    def _start_crossfade(self, remaining_ms: int) -> None:
+        """Start the preloaded track silently and ramp the two players across."""
+        index = self._preloaded_index
+        if index is None or not (0 <= index < len(self.playlist)):
+            return
+        self._preloaded_index = None
+        self.seek_scheduler.cancel()
+        outgoing = self.player
+        self.player, self._next_player = self._next_player, outgoing
+        self._fade_out_player = outgoing
+        fade_ms = max(1, min(self.crossfade_ms, remaining_ms))
+        self.player.set_volume(0)
+        self._shuffle_jump(index)
+        self.current_index = index
+        self._seed_duration(index)
+        self.player.play()
+        self._schedule_prefetch()
+        self._ramps.ramp(outgoing, self.volume, 0, fade_ms, on_done=partial(self._finish_crossfade, outgoing))
+        self._ramps.ramp(self.player, 0, self.volume, fade_ms)
+        self.track_changed_signal.emit(index)
+
+    def _finish_crossfade(self, outgoing: EnginePlayer) -> None:
+        # Runs on the ramp thread
+        outgoing.stop()
+        if self._fade_out_player is outgoing:
+            self._fade_out_player = None
+
+    def _cancel_crossfade(self) -> None:
+        """Cut a running crossfade short: silence the old track, restore the new one."""
+        outgoing = self._fade_out_player
+        if outgoing is None:
+            return
+        self._fade_out_player = None
+        self._ramps.cancel(outgoing)
+        self._ramps.cancel(self.player)
+        outgoing.stop()
+        self.player.set_volume(self.volume)
+
+    def _discard_preload(self) -> None:
+        if self._preloaded_index is not None:
+            self._preloaded_index = None
+            self._next_player.stop()
+
+    def _switch_to_preloaded(self) -> None:
+        """Start the pre-opened track and make its player the active one."""
+        index = self._preloaded_index
+        if index is None or not (0 <= index < len(self.playlist)):
+            self.song_ended_signal.emit()
+            return
+        self._preloaded_index = None
+        self.seek_scheduler.cancel()
+        self.player, self._next_player = self._next_player, self.player
+        self.player.set_volume(self.volume)
+        self._shuffle_jump(index)
+        self.current_index = index
+        self._seed_duration(index)
+        self.player.play()
+        self._schedule_prefetch()
+        self.track_changed_signal.emit(index)
 
     def set_volume(self, val: int) -> None:
         """Set the playback volume."""
         self.volume = val
-        self.player.audio_set_volume(val)
+        outgoing = self._fade_out_player
+        if outgoing is not None:
+            # Let the running ramps head for the new level instead of jumping
+            self._ramps.retarget(outgoing, start=val)
+            self._ramps.retarget(self.player, end=val)
+        else:
+            self.player.set_volume(val)
 
     def seek(self, value: int) -> None:
         """Seek to a position in the current song."""
         if self.duration_ms > 0:
             new_time = value / 1000 * self.duration_ms
-            self.player.set_time(int(new_time))
-
-    def check_duration(self, retries: int = 10) -> None:
-        """Check the duration of the current song, retrying if necessary."""
-        length = self.player.get_length()
-        if length > 0:
-            self.duration_ms = length
-            self.length_known_signal.emit(length)
-        elif retries > 0:
-            QTimer.singleShot(300, lambda: self.check_duration(retries - 1))
-        else:
-            self.duration_ms = 0
+            self.seek_scheduler.request(int(new_time))
+
+    def _seed_duration(self, index: int) -> None:
+        """Use the cached tag duration until VLC reports the exact length."""
+        seconds = self.track_store.duration(self.playlist.track_id(index))
+        self.duration_ms = seconds * 1000
+        if self.duration_ms > 0:
+            self.length_known_signal.emit(self.duration_ms)
 
     def get_time(self) -> int:
         """Get the current playback time in ms."""
@@ -114,13 +486,41 @@ class PlayerController(QObject):
         """Get the length of the current song in ms."""
         return self.player.get_length()
 
-    def _handle_song_end(self, event) -> None:
+    def _handle_song_end(self, player: EnginePlayer) -> None:
         """Handle the end of a song and emit the signal."""
-        self.song_ended_signal.emit()
+        if player is not self.player:
+            return  # the track that was faded out
+        self._ended_at = time.perf_counter()
+        if self.gapless and self._preloaded_index is not None:
+            # libvlc forbids calling back into players from its event thread
+            self._gapless_switch_signal.emit()
+        else:
+            self.song_ended_signal.emit()
+
+    def _on_time_changed(self, player: EnginePlayer, time_ms: int) -> None:
+        """Forward engine time updates to the GUI thread for preload/crossfade checks."""
+        if player is not self.player or self._fade_out_player is not None or self.duration_ms <= 0:
+            return
+        # Only cross threads once a preload or crossfade is actually due
+        remaining = self.duration_ms - time_ms
+        if self._preloaded_index is None:
+            due = (self.gapless or self.crossfade_ms > 0) and remaining <= self._preload_lead_ms()
+        else:
+            due = self.crossfade_ms > 0 and remaining <= self.crossfade_ms
+        if due:
+            self._time_changed_signal.emit(time_ms)
 
-    def _on_length_known(self, event) -> None:
-        """Handle when the song length is known and emit the signal."""
-        self.length_known_signal.emit(self.player.get_length())
+    def _on_playing(self) -> None:
+        """Record the silence between the previous track ending and this one starting."""
+        if self._ended_at is not None:
+            self.last_track_gap_ms = (time.perf_counter() - self._ended_at) * 1000.0
+            self._ended_at = None
+
+    def _on_length_known(self, player: EnginePlayer, length_ms: int) -> None:
+        """Correct the seeded duration with the engine's exact length and emit the signal."""
+        if player is self.player and length_ms > 0:
+            self.duration_ms = length_ms
+            self.length_known_signal.emit(length_ms)
 
     def get_current_song_path(self) -> str | None:
         """Get the path of the current song, or None if not available."""
@@ -128,6 +528,35 @@ class PlayerController(QObject):
             return self.playlist[self.current_index]
         return None
 
+    def get_current_track_id(self) -> int | None:
+        """Get the track ID of the current song, or None if not available."""
+        if 0 <= self.current_index < len(self.playlist):
+            return self.playlist.track_id(self.current_index)
+        return None
+
     def reorder_playlist(self, new_order: list[str]) -> None:
-        """Reorder the playlist to match the new order."""
-        self.playlist = new_order 
\ No newline at end of file
+        """Reorder the playlist to match the new order, keeping the current track."""
+        current_id = self.get_current_track_id()
+        preloaded_id = None
+        if self._preloaded_index is not None and self._preloaded_index < len(self.playlist):
+            preloaded_id = self.playlist.track_id(self._preloaded_index)
+        self.playlist.replace(new_order)
+        if self.playlist_model is not None:
+            self.playlist_model.reset()
+        # The shuffle order is keyed by track ID, so only row numbers need remapping
+        if current_id is not None:
+            self.current_index = self.playlist.row_of(current_id)
+        if preloaded_id is not None:
+            self._preloaded_index = self.playlist.row_of(preloaded_id)
+            if self._preloaded_index < 0:
+                self._discard_preload()
+
+    def cleanup(self) -> None:
+        """Release both players; the shared engine outlives the controller."""
+        self._ramps.close()
+        self.prefetcher.close()
+        for player in (self.player, self._next_player):
+            try:
+                player.release()
+            except Exception as e:
+                print(f"Player cleanup error (non-fatal): {e}")
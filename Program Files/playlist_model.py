@@ -0,0 +1,176 @@
+# playlist_model.py - List model backing the playlist view
+from typing import Any, Dict, Iterable, List, Tuple
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from track_store import Playlist, move_blocks
+
+
+class PlaylistModel(QAbstractListModel):
+    """Playlist model that reads rows straight from a shared Playlist.
+
+    The model never copies track data: bind it to the controller's Playlist
+    with set_playlist() and both sides see the same track IDs. Display text is
+    looked up lazily in the TrackStore from data(), and rows are exposed a page
+    at a time via fetchMore() so loading a huge playlist costs nothing until
+    the rows are scrolled to.
+    """
+
+    PathRole = Qt.ItemDataRole.UserRole + 1
+    TrackIdRole = Qt.ItemDataRole.UserRole + 2
+    PAGE_SIZE = 1000
+    # Past this many ranges a bulk delete resets the view instead of one rowsRemoved per range
+    RANGE_NOTIFY_LIMIT = 32
+
+    def __init__(self, playlist: Playlist | None = None, parent=None):
+        super().__init__(parent)
+        self._playlist = playlist if playlist is not None else Playlist()
+        self._loaded = min(len(self._playlist), self.PAGE_SIZE)
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < self._loaded):
+            return None
+        track_id = self._playlist.ids[index.row()]
+        store = self._playlist.store
+        if role == Qt.ItemDataRole.DisplayRole:
+            return store.title(track_id) or store.name(track_id)
+        if role == Qt.ItemDataRole.ToolTipRole or role == self.PathRole:
+            return store.path(track_id)
+        if role == self.TrackIdRole:
+            return track_id
+        return None
+
+    def flags(self, index):
+        default = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.isValid():
+            return default | Qt.ItemFlag.ItemIsDragEnabled
+        return Qt.ItemFlag.ItemIsDropEnabled
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._playlist)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, len(self._playlist) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def moveRows(self, source_parent, source_row, count, dest_parent, dest_child):
+        """Move a contiguous block of rows; dest_child is in pre-move coordinates."""
+        if count <= 0 or source_parent.isValid() or dest_parent.isValid():
+            return False
+        if not (0 <= source_row and source_row + count <= self._loaded and 0 <= dest_child <= self._loaded):
+            return False
+        if source_row <= dest_child <= source_row + count:
+            return False  # dropping a block onto itself
+        if not self.beginMoveRows(QModelIndex(), source_row, source_row + count - 1, QModelIndex(), dest_child):
+            return False
+        self._playlist.move(source_row, count, dest_child)
+        self.endMoveRows()
+        return True
+
+    # --- Playlist helpers ---
+
+    def move_rows(self, rows: Iterable[int], dest: int) -> bool:
+        """Move the given rows, keeping their order, so they land before ``dest``.
+
+        ``dest`` is a row in pre-move coordinates. Each contiguous block is
+        moved with moveRows(), so views get move notifications, not a reset.
+        """
+        moved = False
+        for start, count, target in move_blocks((r for r in rows if r < self._loaded), dest):
+            moved |= self.moveRows(QModelIndex(), start, count, QModelIndex(), target)
+        return moved
+
+    def insert_tracks(self, row: int, paths: Iterable[str]) -> int:
+        """Insert tracks before ``row``; views get one rowsInserted for the loaded part."""
+        ids = self._playlist.store.add_many(paths)
+        count = len(ids)
+        if not count:
+            return 0
+        fully_loaded = self._loaded == len(self._playlist)
+        if row < self._loaded or (row == self._loaded and fully_loaded):
+            self.beginInsertRows(QModelIndex(), row, row + count - 1)
+            self._playlist.insert_ids(row, ids)
+            self._loaded += count
+            self.endInsertRows()
+        else:
+            # Past the loaded page; fetchMore() will expose them
+            self._playlist.insert_ids(row, ids)
+        return count
+
+    def remove_rows(self, start: int, count: int) -> bool:
+        """Remove a range of rows; views get one rowsRemoved for the loaded part."""
+        end = min(start + count, len(self._playlist))
+        if start < 0 or start >= end:
+            return False
+        visible_end = min(end, self._loaded)
+        if start < visible_end:
+            self.beginRemoveRows(QModelIndex(), start, visible_end - 1)
+            self._playlist.remove(start, end - start)
+            self._loaded -= visible_end - start
+            self.endRemoveRows()
+        else:
+            self._playlist.remove(start, end - start)
+        return True
+
+    def remove_ranges(self, ranges: List[Tuple[int, int]]) -> int:
+        """Remove sorted, disjoint (start, count) ranges; returns the rows removed."""
+        if len(ranges) <= self.RANGE_NOTIFY_LIMIT:
+            removed = 0
+            # Bottom-up, so earlier ranges keep their row numbers
+            for start, count in reversed(ranges):
+                if self.remove_rows(start, count):
+                    removed += count
+            return removed
+        loaded_removed = sum(max(0, min(s + c, self._loaded) - s) for s, c in ranges if s < self._loaded)
+        self.beginResetModel()
+        removed = self._playlist.remove_ranges(ranges)
+        self._loaded = min(len(self._playlist), max(self.PAGE_SIZE, self._loaded - loaded_removed))
+        self.endResetModel()
+        return removed
+
+    def playlist(self) -> Playlist:
+        return self._playlist
+
+    def set_playlist(self, playlist: Playlist):
+        """Bind the model to a (shared) Playlist and reset the view."""
+        self.beginResetModel()
+        self._playlist = playlist
+        self._loaded = min(len(playlist), self.PAGE_SIZE)
+        self.endResetModel()
+
+    def reset(self):
+        """Re-read the bound Playlist after it was replaced wholesale."""
+        self.set_playlist(self._playlist)
+
+    def append_tracks(self, paths: Iterable[str]):
+        """Append tracks; only rows needed to fill the first page are inserted now."""
+        fully_loaded = self._loaded == len(self._playlist)
+        self._playlist.extend(paths)
+        if fully_loaded and self._loaded < self.PAGE_SIZE:
+            self.fetchMore()
+
+    def path_at(self, row: int) -> str | None:
+        if 0 <= row < len(self._playlist):
+            return self._playlist[row]
+        return None
+
+    def update_metadata(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Store a metadata batch in the TrackStore and repaint once."""
+        if not self._playlist.store.update_metadata(batch):
+            return
+        if self._loaded:
+            self.dataChanged.emit(self.index(0), self.index(self._loaded - 1), [Qt.ItemDataRole.DisplayRole])
@@ -0,0 +1,92 @@
+# position_publisher.py - Coalesces playback position updates for the UI
+from PyQt6.QtCore import QEvent, QObject, QTimer, pyqtSignal
+
+
+class PositionPublisher(QObject):
+    """Turns a stream of engine time callbacks into a fixed-rate signal.
+
+    push() may be called from any thread (libvlc's event thread included): it
+    only stores the latest time, so nothing is posted to the Qt queue per
+    callback. A GUI-thread timer publishes the newest value at ``rate_hz``
+    and parks itself after a second without updates. While the watched
+    window is hidden or minimized the timer does not run at all.
+    """
+
+    position_changed = pyqtSignal(int)
+    _wake = pyqtSignal()
+
+    def __init__(self, rate_hz: int = 20, parent=None):
+        super().__init__(parent)
+        self._latest = -1
+        self._published = -1
+        self._visible = True
+        # Read from the engine thread; only ever set True there
+        self._running = False
+        self._idle_ticks = 0
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._flush)
+        self._wake.connect(self._on_wake)
+        self.set_rate(rate_hz)
+
+    def set_rate(self, rate_hz: int):
+        """Set the publish rate in Hz (clamped to 1-60)."""
+        self.rate_hz = max(1, min(60, int(rate_hz)))
+        self._timer.setInterval(round(1000 / self.rate_hz))
+
+    def push(self, time_ms: int):
+        """Record the latest position; safe to call from any thread."""
+        self._latest = time_ms
+        if not self._running and self._visible:
+            self._running = True
+            self._wake.emit()
+
+    def publish_now(self, time_ms: int):
+        """Emit ``time_ms`` immediately, e.g. after a user seek (GUI thread)."""
+        self._latest = self._published = time_ms
+        self.position_changed.emit(time_ms)
+
+    def set_visible(self, visible: bool):
+        if visible == self._visible:
+            return
+        self._visible = visible
+        if not visible:
+            self._timer.stop()
+            self._running = False
+        elif self._latest != self._published:
+            self._flush()
+            self._running = True
+            self._timer.start()
+
+    def watch_window(self, window):
+        """Pause publishing whenever ``window`` is hidden or minimized."""
+        window.installEventFilter(self)
+        self.set_visible(window.isVisible() and not window.isMinimized())
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Type.Show, QEvent.Type.Hide, QEvent.Type.WindowStateChange):
+            self.set_visible(obj.isVisible() and not obj.isMinimized())
+        return False
+
+    def stop(self):
+        self._timer.stop()
+        self._running = False
+
+    def _on_wake(self):
+        if self._visible:
+            self._idle_ticks = 0
+            self._timer.start()
+        else:
+            self._running = False
+
+    def _flush(self):
+        latest = self._latest
+        if latest == self._published:
+            self._idle_ticks += 1
+            if self._idle_ticks >= self.rate_hz:
+                # Paused or stopped; the next push() wakes the timer again
+                self._timer.stop()
+                self._running = False
+            return
+        self._idle_ticks = 0
+        self._published = latest
+        self.position_changed.emit(latest)
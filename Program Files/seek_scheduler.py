@@ -0,0 +1,68 @@
+# seek_scheduler.py - Debounces seek requests from slider drags
+from typing import Callable
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class SeekScheduler(QObject):
+    """Applies only the latest seek target, with at most one seek in flight.
+
+    The first request seeks immediately (leading edge). Requests that arrive
+    while a seek is settling replace each other, and only the last one is
+    applied once the settle window ends (trailing edge). However fast the
+    slider moves, the player is left at the last target within one
+    ``settle_ms``. preview_changed fires for every request, so the UI can
+    show the target time without waiting for the player.
+    """
+
+    preview_changed = pyqtSignal(int)
+
+    def __init__(self, apply_seek: Callable[[int], None], settle_ms: int = 150, parent=None):
+        super().__init__(parent)
+        self._apply_seek = apply_seek
+        self._pending: int | None = None
+        self._dragging = False
+        # Plain flag so engine-thread callbacks can check it cheaply
+        self.busy = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(settle_ms)
+        self._timer.timeout.connect(self._on_settled)
+
+    def request(self, target_ms: int):
+        """Seek to ``target_ms``, now if idle or when the current seek settles."""
+        target_ms = max(0, int(target_ms))
+        self.preview_changed.emit(target_ms)
+        if self._timer.isActive():
+            self._pending = target_ms
+        else:
+            self._start(target_ms)
+
+    def begin_drag(self):
+        self._dragging = True
+        self.busy = True
+
+    def end_drag(self, target_ms: int | None = None):
+        """Finish a drag; ``target_ms`` is the release position, if any."""
+        self._dragging = False
+        if target_ms is not None:
+            self.request(target_ms)
+        self.busy = self._timer.isActive()
+
+    def cancel(self):
+        """Drop any pending seek, e.g. when a different track starts."""
+        self._pending = None
+        self._timer.stop()
+        self.busy = self._dragging
+
+    def _start(self, target_ms: int):
+        self._pending = None
+        self.busy = True
+        self._apply_seek(target_ms)
+        self._timer.start()
+
+    def _on_settled(self):
+        if self._pending is not None:
+            self._start(self._pending)
+        else:
+            self.busy = self._dragging
@@ -0,0 +1,178 @@
+# shuffle_order.py - Shuffle play order with history
+import random
+from array import array
+from typing import Dict, Iterable, List
+
+# Marks a removed key inside the drawn part of the order
+_GONE = 0xFFFFFFFF
+
+
+class ShuffleOrder:
+    """A lazily drawn Fisher-Yates permutation of track IDs.
+
+    ``_order[:_drawn]`` is the order fixed so far: history up to the cursor,
+    then any tracks already peeked at. ``_order[_drawn:]`` is the undrawn
+    pool. Each step of the shuffle is drawn only when it is needed, so next,
+    previous and peek are O(1) per track, whatever the playlist size. Adding
+    a track puts it in the pool. Removing one from the pool swaps it with the
+    last entry; removing one from the drawn part leaves a tombstone that is
+    compacted away later. Both are O(1) amortized, and the order of every
+    other track is unchanged.
+    """
+
+    def __init__(self, keys: Iterable[int] = (), rng: random.Random | None = None):
+        self._order = array("I", dict.fromkeys(keys))
+        self._drawn = 0
+        self._cursor = -1
+        self._gone = 0
+        # key -> position; built on first edit or jump, then kept up to date
+        self._pos: Dict[int, int] | None = None
+        self._rng = rng if rng is not None else random.Random()
+
+    def __len__(self) -> int:
+        return len(self._order) - self._gone
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._positions()
+
+    def current(self) -> int | None:
+        if 0 <= self._cursor < len(self._order):
+            key = self._order[self._cursor]
+            if key != _GONE:
+                return key
+        return None
+
+    def peek(self, count: int = 1) -> List[int]:
+        """The next ``count`` keys in this cycle, drawing them if needed."""
+        keys: List[int] = []
+        i = self._cursor + 1
+        while len(keys) < count and i < len(self._order):
+            self._draw_to(i)
+            if self._order[i] != _GONE:
+                keys.append(self._order[i])
+            i += 1
+        return keys
+
+    def next(self) -> int | None:
+        """Advance to the next key, or return None when the cycle is exhausted."""
+        i = self._cursor + 1
+        while i < len(self._order):
+            self._draw_to(i)
+            if self._order[i] != _GONE:
+                self._cursor = i
+                return self._order[i]
+            i += 1
+        return None
+
+    def previous(self) -> int | None:
+        """Step back through the history, or return None at its start."""
+        i = self._cursor - 1
+        while i >= 0:
+            if self._order[i] != _GONE:
+                self._cursor = i
+                return self._order[i]
+            i -= 1
+        return None
+
+    def jump(self, key: int):
+        """Make ``key`` current, e.g. when the user picks a track directly.
+
+        A key from history moves the cursor back to it; any other key is
+        placed straight after the cursor, so the rest of the order is kept.
+        """
+        pos = self._positions()
+        if key not in pos:
+            self.add(key)
+        p = pos[key]
+        if p <= self._cursor:
+            self._cursor = p
+            return
+        target = self._cursor + 1
+        if p != target:
+            if self._order[target] == _GONE:
+                # Fill the tombstone instead of moving it into the pool
+                self._order[target] = key
+                pos[key] = target
+                if p >= self._drawn:
+                    self._gone -= 1
+                    self._drop(p)
+                else:
+                    self._order[p] = _GONE
+            else:
+                self._swap(target, p)
+        self._drawn = max(self._drawn, target + 1)
+        self._cursor = target
+
+    def add(self, key: int):
+        pos = self._positions()
+        if key in pos:
+            return
+        pos[key] = len(self._order)
+        self._order.append(key)
+
+    def remove(self, key: int):
+        p = self._positions().pop(key, None)
+        if p is None:
+            return
+        if p >= self._drawn:
+            self._drop(p)
+            return
+        self._order[p] = _GONE
+        self._gone += 1
+        if self._gone > 64 and self._gone * 2 > len(self._order):
+            self._compact()
+
+    def new_cycle(self):
+        """Start a fresh cycle, avoiding an immediate repeat of the current key."""
+        last = self.current()
+        self._compact()
+        self._drawn = 0
+        self._cursor = -1
+        if last is not None and len(self._order) > 1:
+            self._draw_to(0)
+            if self._order[0] == last:
+                self._swap(0, self._rng.randrange(1, len(self._order)))
+
+    def _draw_to(self, i: int):
+        order = self._order
+        while self._drawn <= i:
+            j = self._rng.randrange(self._drawn, len(order))
+            if j != self._drawn:
+                self._swap(self._drawn, j)
+            self._drawn += 1
+
+    def _swap(self, i: int, j: int):
+        order = self._order
+        order[i], order[j] = order[j], order[i]
+        if self._pos is not None:
+            if order[i] != _GONE:
+                self._pos[order[i]] = i
+            if order[j] != _GONE:
+                self._pos[order[j]] = j
+
+    def _drop(self, p: int):
+        """Remove the pool entry at ``p`` (p >= _drawn) by swapping in the last one."""
+        last = len(self._order) - 1
+        if p != last:
+            self._order[p] = self._order[last]
+            if self._pos is not None:
+                self._pos[self._order[p]] = p
+        self._order.pop()
+
+    def _positions(self) -> Dict[int, int]:
+        if self._pos is None:
+            self._pos = {key: i for i, key in enumerate(self._order) if key != _GONE}
+        return self._pos
+
+    def _compact(self):
+        if not self._gone:
+            return
+        drawn = self._order[:self._drawn]
+        live = array("I", (k for k in drawn if k != _GONE))
+        before_cursor = drawn[:self._cursor + 1]
+        self._cursor = len(before_cursor) - before_cursor.count(_GONE) - 1
+        self._drawn = len(live)
+        live.extend(self._order[len(drawn):])
+        self._order = live
+        self._gone = 0
+        self._pos = None
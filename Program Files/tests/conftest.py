@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Modules live at the top of "Program Files" and import each other by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture
+def engine():
+    from playback_engine import FakePlaybackEngine
+    engine = FakePlaybackEngine(default_length_ms=10000, tick_ms=250)
+    yield engine
+    engine.release()
+
+
+@pytest.fixture
+def controller(engine):
+    from player_controller import PlayerController
+    controller = PlayerController(engine)
+    yield controller
+    controller.cleanup()
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+
+def _run(controller, engine, tracks, ms):
+    changed, ended = [], []
+    controller.track_changed_signal.connect(changed.append)
+    controller.song_ended_signal.connect(lambda: ended.append(controller.current_index))
+    controller.set_playlist(tracks)
+    controller.play_song(0)
+    engine.advance(ms)
+    return changed, ended
+
+
+def test_gapless_hands_over_and_then_ends(controller, engine):
+    controller.set_gapless(True)
+    changed, ended = _run(controller, engine, ["a.mp3", "b.mp3", "c.mp3"], 40000)
+    assert changed == [1, 2]
+    assert ended == [2]
+    assert not controller.is_playing()
+
+
+def test_gapless_track_gap_is_measured(controller, engine):
+    controller.set_gapless(True)
+    _run(controller, engine, ["a.mp3", "b.mp3"], 10000)
+    assert controller.last_track_gap_ms is not None
+    # The next track was pre-opened, so the handover is a play() call
+    assert controller.last_track_gap_ms < 50
+
+
+def test_repeat_all_wraps_to_the_first_track(controller, engine):
+    controller.set_gapless(True)
+    controller.set_repeat_mode("all")
+    changed, ended = _run(controller, engine, ["a.mp3", "b.mp3"], 30000)
+    assert changed == [1, 0, 1]
+    assert ended == []
+
+
+def test_repeat_one_repeats_the_current_track(controller, engine):
+    controller.set_gapless(True)
+    controller.set_repeat_mode("one")
+    changed, ended = _run(controller, engine, ["a.mp3", "b.mp3"], 30000)
+    assert changed == [0, 0, 0]
+    assert ended == []
+
+
+def test_crossfade_does_not_fade_the_last_track_into_itself(controller, engine):
+    controller.set_crossfade(300)
+    changed, ended = [], []
+    controller.track_changed_signal.connect(changed.append)
+    controller.song_ended_signal.connect(lambda: ended.append(controller.current_index))
+    controller.set_playlist(["a.mp3", "b.mp3", "c.mp3"])
+    controller.play_song(0)
+    for _ in range(40):
+        engine.advance(1000)
+        # Volume ramps run in real time; let each fade finish before moving on
+        deadline = time.perf_counter() + 5
+        while controller._fade_out_player is not None and time.perf_counter() < deadline:
+            time.sleep(0.01)
+    assert changed == [1, 2]
+    assert ended == [2]
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_gapless_soak_measures_every_gap(controller, engine, shuffle):
+    controller.set_gapless(True)
+    controller.set_shuffle(shuffle)
+    gaps = []
+    controller.track_changed_signal.connect(lambda _: gaps.append(controller.last_track_gap_ms))
+    start = time.perf_counter()
+    _run(controller, engine, [f"{i}.mp3" for i in range(50)], 50 * 10000)
+    assert len(gaps) == 49
+    assert all(gap is not None and gap < 50 for gap in gaps)
+    assert time.perf_counter() - start < 10
+
+
+def test_set_playlist_discards_pending_preload(controller, engine):
+    controller.set_gapless(True)
+    _run(controller, engine, ["a.mp3", "b.mp3", "c.mp3"], 6000)
+    assert controller._preloaded_index == 1
+    controller.set_playlist(["x.mp3", "y.mp3", "z.mp3"])
+    engine.advance(5000)
+    playing = [p.path for p in engine.players if p.is_playing()]
+    assert "b.mp3" not in playing
+    assert controller._preloaded_index is None
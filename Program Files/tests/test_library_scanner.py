@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+from workers import library_scanner
+from workers.library_scanner import LibraryScanManager, LibraryScanner
+
+
+def test_flush_interval_checked_per_folder(qapp, monkeypatch):
+    events = []
+    clock = [0.0]
+
+    def walk(root, ignore_patterns, should_stop):
+        yield "/m/a", [], [SimpleNamespace(path="/m/a/01.mp3")]
+        # Slow folders without audio; the file found before them is due
+        for i in range(3):
+            clock[0] += 1.0
+            events.append(f"empty {i}")
+            yield f"/m/empty{i}", [], []
+
+    monkeypatch.setattr(library_scanner, "walk_library", walk)
+    monkeypatch.setattr(library_scanner.time, "monotonic", lambda: clock[0])
+    scanner = LibraryScanner("/m", first_chunk=100, chunk_interval_ms=250)
+    scanner.files_found.connect(events.append)
+    scanner.process()
+    assert events[:2] == ["empty 0", ["/m/a/01.mp3"]]
+
+
+def test_manager_tolerates_parent_without_slot(qapp):
+    added = []
+    manager = LibraryScanManager(parent=object(), metadata_manager=SimpleNamespace(add_files=added.extend))
+    manager._on_files_found(["/m/a/01.mp3"])
+    assert added == ["/m/a/01.mp3"]
@@ -0,0 +1,81 @@
+import os
+import time
+
+from workers.library_watcher import LibraryWatcher
+
+
+def _watch(root, **kwargs):
+    # No worker thread: the index runs inline, so signals are delivered directly
+    watcher = LibraryWatcher(**kwargs)
+    watcher._index.build(str(root))
+    return watcher
+
+
+def _retag(track):
+    # Same size, new mtime: no directory event, only a re-list sees it
+    track.write_bytes(b"\1" * 64)
+    st = track.stat()
+    os.utime(track, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_sweep_reports_in_place_retag(qapp, tmp_path):
+    for album in ("a", "b", "c"):
+        (tmp_path / album).mkdir()
+        (tmp_path / album / "01.mp3").write_bytes(b"\0" * 64)
+    track = tmp_path / "b" / "01.mp3"
+    watcher = _watch(tmp_path, rescan_ms=3000)
+    changed = []
+    watcher.files_changed.connect(changed.extend)
+    try:
+        _retag(track)
+        # 4 folders at 1 s ticks over 3 s: two ticks cover them all
+        for _ in range(2):
+            watcher._index.sweep_step()
+        assert changed == [str(track)]
+    finally:
+        watcher.cleanup()
+
+
+def test_sweep_is_opt_in(qapp, tmp_path):
+    watcher = LibraryWatcher()
+    try:
+        watcher.watch(str(tmp_path))
+        assert not watcher._sweep.isActive()
+    finally:
+        watcher.cleanup()
+
+
+def test_dirty_folder_reports_new_subtree_and_removals(qapp, tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "01.mp3").write_bytes(b"\0")
+    watcher = _watch(tmp_path)
+    added, removed = [], []
+    watcher.files_added.connect(added.extend)
+    watcher.files_removed.connect(removed.extend)
+    try:
+        (tmp_path / "a" / "01.mp3").unlink()
+        (tmp_path / "b" / "cd1").mkdir(parents=True)
+        (tmp_path / "b" / "cd1" / "01.mp3").write_bytes(b"\0")
+        watcher._on_directory_changed(str(tmp_path))
+        watcher._on_directory_changed(str(tmp_path / "a"))
+        watcher._process_dirty()
+        assert added == [str(tmp_path / "b" / "cd1" / "01.mp3")]
+        assert removed == [str(tmp_path / "a" / "01.mp3")]
+        assert str(tmp_path / "b" / "cd1") in watcher._watcher.directories()
+    finally:
+        watcher.cleanup()
+
+
+def test_snapshot_is_built_off_the_gui_thread(qapp, tmp_path):
+    (tmp_path / "a").mkdir()
+    watcher = LibraryWatcher()
+    try:
+        watcher.watch(str(tmp_path))
+        deadline = time.monotonic() + 5
+        while len(watcher._watcher.directories()) < 2 and time.monotonic() < deadline:
+            qapp.processEvents()
+            time.sleep(0.01)
+        assert watcher._index.thread() is not qapp.thread()
+        assert sorted(watcher._watcher.directories()) == [str(tmp_path), str(tmp_path / "a")]
+    finally:
+        watcher.cleanup()
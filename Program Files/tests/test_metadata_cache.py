@@ -0,0 +1,130 @@
+from workers.metadata_cache import MetadataCache
+from workers.metadata_worker import MetadataManager
+
+
+def _track(folder, name="01.mp3", data=b"\0" * 32):
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_offline_library_keeps_its_rows(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    track = _track(tmp_path / "nas" / "album")
+    manager = MetadataManager(cache=MetadataCache(db))
+    manager.cache.put(track, {"title": "One"})
+    # Unmount the share, look the track up, then shut down
+    (tmp_path / "nas").rename(tmp_path / "offline")
+    assert manager.cache.get(track) is None
+    manager.cleanup()
+    (tmp_path / "offline").rename(tmp_path / "nas")
+    cache = MetadataCache(db)
+    try:
+        assert cache.get(track) == {"title": "One"}
+    finally:
+        cache.close()
+
+
+def _retag(path, data=b"\1" * 48):
+    # A different size changes the key even where mtime resolution is coarse
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_rows_survive_reopen(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    track = _track(tmp_path)
+    cache = MetadataCache(db)
+    cache.put(track, {"title": "One", "duration": 61})
+    cache.close()
+    cache = MetadataCache(db)
+    try:
+        assert cache.get(track) == {"title": "One", "duration": 61}
+    finally:
+        cache.close()
+
+
+def test_changed_file_is_evicted(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    track = _track(tmp_path)
+    cache = MetadataCache(db)
+    cache.put(track, {"title": "One"})
+    _retag(track)
+    assert cache.get(track) is None
+    assert track not in cache._rows
+    cache.close()
+    # The stale row is gone from disk too, not just from memory
+    cache = MetadataCache(db)
+    try:
+        assert track not in cache._rows
+    finally:
+        cache.close()
+
+
+def test_evictions_are_deleted_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(MetadataCache, "COMMIT_EVERY", 4)
+    db = str(tmp_path / "cache.sqlite3")
+    tracks = [_track(tmp_path, f"{i:02}.mp3") for i in range(4)]
+    cache = MetadataCache(db)
+    for track in tracks:
+        cache.put(track, {"title": track})
+    cache.evict(tracks[0])
+    cache.evict(tracks[1])
+    # Dropped from memory at once, deleted from SQLite with the next batch
+    assert cache.get(tracks[0]) is None
+    assert cache._deleted == {tracks[0], tracks[1]}
+    rows = cache._conn.execute(f"SELECT COUNT(*) FROM {MetadataCache.TABLE}").fetchone()[0]
+    assert rows == 4
+    cache.evict(tracks[2])
+    cache.evict(tracks[3])
+    assert not cache._deleted
+    rows = cache._conn.execute(f"SELECT COUNT(*) FROM {MetadataCache.TABLE}").fetchone()[0]
+    assert rows == 0
+    cache.close()
+
+
+def test_put_after_evict_is_not_deleted(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    track = _track(tmp_path)
+    cache = MetadataCache(db)
+    cache.put(track, {"title": "Old"})
+    cache.evict(track)
+    cache.put(track, {"title": "New"})
+    cache.close()
+    cache = MetadataCache(db)
+    try:
+        assert cache.get(track) == {"title": "New"}
+    finally:
+        cache.close()
+
+
+class _Receiver:
+    def __init__(self):
+        self.batches = []
+
+    def on_metadata_batch_ready(self, batch):
+        self.batches.append(batch)
+
+    def on_metadata_error(self, filepath, error):
+        pass
+
+
+def test_cache_hits_are_delivered_without_workers(tmp_path):
+    cache = MetadataCache(str(tmp_path / "cache.sqlite3"))
+    tracks = [_track(tmp_path, f"{i:02}.mp3") for i in range(3)]
+    for track in tracks[:2]:
+        cache.put(track, {"title": track})
+    receiver = _Receiver()
+    manager = MetadataManager(parent=receiver, cache=cache, max_workers=1)
+    try:
+        manager.add_files(tracks[:2])
+        assert receiver.batches == [[(t, {"title": t}) for t in tracks[:2]]]
+        assert not manager.workers and len(manager.queue) == 0
+        # Only the miss is queued; a cancelled queue starts no worker for it
+        manager.queue.cancel()
+        manager.add_files(tracks)
+        assert receiver.batches[-1] == [(t, {"title": t}) for t in tracks[:2]]
+        assert len(manager.queue) == 1 and not manager.workers
+    finally:
+        manager.cleanup()
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from playlist_model import PlaylistModel
+from ui_builder import UIBuilder
+from workers.metadata_cache import MetadataCache
+from workers.metadata_worker import (PRIORITY_BACKGROUND, PRIORITY_NEXT_UP, PRIORITY_NOW_PLAYING,
+                                     PRIORITY_VISIBLE, MetadataManager, MetadataQueue, MetadataWorker)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = MetadataManager(cache=MetadataCache(str(tmp_path / "cache.sqlite3")))
+    yield manager
+    manager.cleanup()
+
+
+def _drain(queue):
+    order = []
+    while (filepath := queue.take()) is not None:
+        order.append(filepath)
+    return order
+
+
+def test_controller_pushes_now_playing_and_next_up(controller, manager):
+    paths = [f"/music/{i}.mp3" for i in range(10)]
+    controller.set_playlist(paths)
+    controller.metadata_manager = manager
+    manager.queue.add_many(paths)
+    controller.play_song(5)
+    order = _drain(manager.queue)
+    assert order[:4] == ["/music/5.mp3", "/music/6.mp3", "/music/7.mp3", "/music/8.mp3"]
+
+
+def test_visible_rows_are_parsed_first(qapp, manager):
+    paths = [f"/music/{i}.mp3" for i in range(10)]
+    model = PlaylistModel()
+    model.append_tracks(paths)
+    builder = UIBuilder.__new__(UIBuilder)
+    builder.parent = SimpleNamespace(playlist_model=model, metadata_manager=manager)
+    manager.queue.add_many(paths)
+    builder._on_visible_range_changed(7, 8)
+    assert _drain(manager.queue)[:2] == ["/music/7.mp3", "/music/8.mp3"]
+
+
+def _wait(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_slow_file_does_not_hold_back_parsed_results(qapp, tmp_path, monkeypatch):
+    quick, slow = str(tmp_path / "quick.mp3"), str(tmp_path / "slow.mp3")
+    for path in (quick, slow):
+        open(path, "wb").close()
+    release = threading.Event()
+
+    def extract(self, filepath):
+        if filepath == slow:
+            release.wait(5)  # e.g. a stalled network read
+        return {"title": os.path.basename(filepath)}
+
+    monkeypatch.setattr(MetadataWorker, "_extract_metadata", extract)
+    delivered = []
+    parent = SimpleNamespace(on_metadata_batch_ready=lambda batch: delivered.extend(p for p, _ in batch),
+                             on_metadata_error=lambda *args: None)
+    manager = MetadataManager(parent, cache=MetadataCache(str(tmp_path / "cache.sqlite3")),
+                              max_workers=1, batch_interval_ms=20)
+    try:
+        manager.add_files([quick, slow])
+        assert _wait(qapp, lambda: quick in delivered)
+        assert slow not in delivered
+        release.set()
+        assert _wait(qapp, lambda: slow in delivered)
+    finally:
+        release.set()
+        manager.cleanup()
+
+
+def test_reserve_workers_is_bounded_by_limit_and_backlog():
+    queue = MetadataQueue()
+    queue.add_many(["/a.mp3", "/b.mp3", "/c.mp3"])
+    assert queue.reserve_workers(2) == 2
+    # Already at the limit
+    assert queue.reserve_workers(2) == 0
+    queue.add("/d.mp3")
+    assert queue.reserve_workers(3) == 1
+    # Never more new workers than pending files
+    assert queue.reserve_workers(8) == 4
+    # Each worker that finds the queue empty deregisters itself
+    _drain(queue)
+    for _ in range(7):
+        assert queue.take() is None
+    assert queue.reserve_workers(2) == 0
+    queue.add("/e.mp3")
+    assert queue.reserve_workers(2) == 1
+    queue.cancel()
+    queue.add("/f.mp3")
+    assert queue.reserve_workers(8) == 0
+
+
+def test_queue_keeps_insertion_order_and_dedups():
+    queue = MetadataQueue()
+    assert queue.add_many(["/b.mp3", "/a.mp3", "/b.mp3", "", "/c.mp3"]) == 3
+    assert not queue.add("/a.mp3")
+    assert len(queue) == 3
+    assert _drain(queue) == ["/b.mp3", "/a.mp3", "/c.mp3"]
+
+
+def test_discard_pending_and_in_flight_files():
+    queue = MetadataQueue()
+    queue.add_many(["/a.mp3", "/b.mp3", "/c.mp3"])
+    queue.discard("/b.mp3")
+    assert queue.take() == "/a.mp3"
+    # Already handed to a worker: its result is dropped when it finishes
+    queue.discard("/a.mp3")
+    assert not queue.done("/a.mp3")
+    assert queue.take() == "/c.mp3"
+    assert queue.done("/c.mp3")
+    assert queue.take() is None
+    # A dropped file can be queued again later
+    assert queue.add("/a.mp3")
+    assert queue.take() == "/a.mp3"
+    assert queue.done("/a.mp3")
+
+
+def test_urgent_levels_drain_first():
+    queue = MetadataQueue()
+    queue.add_many(["/bg1.mp3", "/bg2.mp3"])
+    queue.add("/next.mp3", PRIORITY_NEXT_UP)
+    queue.add("/row.mp3", PRIORITY_VISIBLE)
+    queue.add("/now.mp3", PRIORITY_NOW_PLAYING)
+    assert _drain(queue) == ["/now.mp3", "/row.mp3", "/next.mp3", "/bg1.mp3", "/bg2.mp3"]
+
+
+def test_reprioritize_promotes_and_demotes():
+    queue = MetadataQueue()
+    queue.add_many([f"/{i}.mp3" for i in range(6)])
+    # Re-adding at a more urgent level promotes; a less urgent one never demotes
+    queue.add("/5.mp3", PRIORITY_VISIBLE)
+    queue.add("/5.mp3", PRIORITY_BACKGROUND)
+    queue.reprioritize(["/3.mp3", "/4.mp3"], PRIORITY_VISIBLE)
+    # Scrolling away puts the old rows back behind the backlog
+    queue.reprioritize(["/2.mp3", "/missing.mp3"], PRIORITY_VISIBLE)
+    assert _drain(queue) == ["/2.mp3", "/0.mp3", "/1.mp3", "/5.mp3", "/3.mp3", "/4.mp3"]
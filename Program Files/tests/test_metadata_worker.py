@@ -0,0 +1,197 @@
+import base64
+import struct
+import time
+
+import pytest
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import APIC, ID3, TALB, TIT2, TPE1
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.oggopus import OggOpus
+from mutagen.oggvorbis import OggVorbis
+from mutagen.ogg import OggPage
+
+from workers.metadata_worker import MetadataWorker, extract_album_art
+
+TAGS = {"title": "Title", "artist": "Artist", "album": "Album"}
+COVER = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 4096  # ~1 MB stand-in JPEG
+
+
+def _mpeg_frames(seconds: int) -> bytes:
+    # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz: 417-byte frames of 1152 samples
+    frame = b"\xff\xfb\x90\x00" + b"\x00" * 413
+    return frame * (seconds * 44100 // 1152 + 3)
+
+
+def _syncsafe(n: int) -> bytes:
+    return bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+
+
+def make_mp3(path, cover=COVER):
+    path.write_bytes(_mpeg_frames(3))
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text=TAGS["title"]))
+    tags.add(TPE1(encoding=3, text=TAGS["artist"]))
+    tags.add(TALB(encoding=3, text=TAGS["album"]))
+    if cover:
+        tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="", data=cover))
+    tags.save(str(path))
+
+
+def make_mp3_v22(path):
+    def frame(fid, text):
+        data = b"\x00" + text.encode("latin-1")
+        return fid + len(data).to_bytes(3, "big") + data
+    body = frame(b"TT2", TAGS["title"]) + frame(b"TP1", TAGS["artist"]) + frame(b"TAL", TAGS["album"])
+    path.write_bytes(b"ID3\x02\x00\x00" + _syncsafe(len(body)) + body + _mpeg_frames(3))
+
+
+def make_flac(path, cover=COVER):
+    # STREAMINFO only: 44.1 kHz, stereo, 16 bit, 3 s
+    info = struct.pack(">HH", 4096, 4096) + b"\x00" * 6
+    info += ((44100 << 44) | (1 << 41) | (15 << 36) | 44100 * 3).to_bytes(8, "big") + b"\x00" * 16
+    path.write_bytes(b"fLaC\x80" + len(info).to_bytes(3, "big") + info)
+    audio = FLAC(str(path))
+    audio.update(TAGS)
+    if cover:
+        picture = Picture()
+        picture.type, picture.mime, picture.data = 3, "image/jpeg", cover
+        audio.add_picture(picture)
+    audio.save()
+
+
+def make_ogg(path, cover=COVER):
+    ident = b"\x01vorbis" + struct.pack("<IBIiii", 0, 2, 44100, 0, 128000, 0) + bytes([0xB8, 1])
+    comment = b"\x03vorbis" + struct.pack("<I", 4) + b"test" + struct.pack("<I", 0) + b"\x01"
+    setup = b"\x05vorbis" + b"\x00" * 10
+    pages = []
+    for seq, (packets, position) in enumerate([([ident], 0), ([comment, setup], 0), ([b"\x00" * 10], 44100 * 3)]):
+        page = OggPage()
+        page.packets, page.sequence, page.serial, page.position = packets, seq, 1, position
+        page.first, page.last = seq == 0, seq == 2
+        pages.append(page)
+    path.write_bytes(b"".join(page.write() for page in pages))
+    audio = OggVorbis(str(path))
+    audio.update(TAGS)
+    if cover:
+        picture = Picture()
+        picture.type, picture.mime, picture.data = 3, "image/jpeg", cover
+        audio["metadata_block_picture"] = [base64.b64encode(picture.write()).decode("ascii")]
+    audio.save()
+
+
+def make_ogg_cover_first(path, cover=COVER):
+    make_ogg(path, cover=None)
+    audio = OggVorbis(str(path))
+    audio.clear()
+    picture = Picture()
+    picture.type, picture.mime, picture.data = 3, "image/jpeg", cover
+    audio["metadata_block_picture"] = [base64.b64encode(picture.write()).decode("ascii")]
+    audio.update(TAGS)
+    audio.save()
+
+
+def make_opus(path, cover=COVER):
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 2, 312, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<I", 4) + b"test" + struct.pack("<I", 0)
+    pages = []
+    for seq, (packets, position) in enumerate([([head], 0), ([tags], 0), ([b"\x00" * 10], 48000 * 3 + 312)]):
+        page = OggPage()
+        page.packets, page.sequence, page.serial, page.position = packets, seq, 7, position
+        page.first, page.last = seq == 0, seq == 2
+        pages.append(page)
+    path.write_bytes(b"".join(page.write() for page in pages))
+    audio = OggOpus(str(path))
+    if cover:
+        picture = Picture()
+        picture.type, picture.mime, picture.data = 3, "image/jpeg", cover
+        audio["metadata_block_picture"] = [base64.b64encode(picture.write()).decode("ascii")]
+    audio.update(TAGS)
+    audio.save()
+
+
+def make_m4a(path, cover=COVER):
+    def atom(name, data):
+        return struct.pack(">I4s", 8 + len(data), name) + data
+    mvhd = atom(b"mvhd", b"\x00" * 4 + struct.pack(">IIII", 0, 0, 1000, 3000) + b"\x00" * 80)
+    mdhd = atom(b"mdhd", b"\x00" * 4 + struct.pack(">IIIIHH", 0, 0, 44100, 44100 * 3, 0, 0))
+    hdlr = atom(b"hdlr", b"\x00" * 8 + b"soun" + b"\x00" * 13)
+    moov = atom(b"moov", mvhd + atom(b"trak", atom(b"mdia", mdhd + hdlr)))
+    path.write_bytes(atom(b"ftyp", b"M4A \x00\x00\x00\x00M4A isom") + moov + atom(b"mdat", b""))
+    audio = MP4(str(path))
+    audio.add_tags()
+    audio["\xa9nam"], audio["\xa9ART"], audio["\xa9alb"] = TAGS["title"], TAGS["artist"], TAGS["album"]
+    if cover:
+        audio["covr"] = [MP4Cover(cover, MP4Cover.FORMAT_JPEG)]
+    audio.save()
+
+
+FORMATS = {"mp3": make_mp3, "flac": make_flac, "ogg": make_ogg, "m4a": make_m4a}
+
+
+@pytest.fixture(params=sorted(FORMATS))
+def fixture_file(request, tmp_path):
+    path = tmp_path / f"track.{request.param}"
+    FORMATS[request.param](path)
+    return str(path)
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_tags_and_duration(fixture_file, fast):
+    metadata = MetadataWorker(fast=fast)._extract_metadata(fixture_file)
+    assert metadata == dict(TAGS, duration=3)
+
+
+def test_cover_is_extracted_on_demand(fixture_file):
+    assert extract_album_art(fixture_file) == COVER
+
+
+def test_id3v22_tags_in_fast_mode(tmp_path):
+    path = tmp_path / "old_itunes_rip.mp3"
+    make_mp3_v22(path)
+    metadata = MetadataWorker(fast=True)._extract_metadata(str(path))
+    assert metadata == dict(TAGS, duration=3)
+
+
+@pytest.mark.parametrize("name, make", [("cover_first.ogg", make_ogg_cover_first), ("track.opus", make_opus)])
+def test_ogg_reader_skips_cover_across_pages(tmp_path, name, make):
+    path = tmp_path / name
+    make(path)
+    fast = MetadataWorker(fast=True)._extract_metadata(str(path))
+    assert fast == MetadataWorker(fast=False)._extract_metadata(str(path)) == dict(TAGS, duration=3)
+
+
+@pytest.mark.parametrize("fmt", ["m4a", "ogg"])
+def test_mislabeled_mp3_falls_back_to_mutagen(tmp_path, fmt):
+    path = tmp_path / f"really_a.{fmt}"
+    FORMATS[fmt](path)
+    mislabeled = path.rename(tmp_path / "mislabeled.mp3")
+    metadata = MetadataWorker(fast=True)._extract_metadata(str(mislabeled))
+    assert metadata == dict(TAGS, duration=3)
+
+
+def test_fast_mode_leaves_artwork_undecoded(tmp_path):
+    path = tmp_path / "track.mp3"
+    make_mp3(path)
+    audio = MetadataWorker(fast=True)._open_audio(str(path))
+    assert not audio.tags.getall("APIC")
+    assert audio.tags.getall("TIT2")
+
+
+@pytest.mark.parametrize("fmt", sorted(FORMATS))
+def test_benchmark_fast_vs_full(tmp_path, fmt):
+    path = tmp_path / f"track.{fmt}"
+    FORMATS[fmt](path, cover=COVER * 4)
+    timings = {}
+    for fast in (False, True):
+        worker = MetadataWorker(fast=fast)
+        worker._extract_metadata(str(path))
+        start = time.perf_counter()
+        for _ in range(20):
+            worker._extract_metadata(str(path))
+        timings[fast] = (time.perf_counter() - start) / 20 * 1000
+    print(f"{fmt}: full {timings[False]:.2f} ms, fast {timings[True]:.2f} ms per file")
+    # Generous margin; fast mode must never be the slower path
+    assert timings[True] <= timings[False] * 1.5 + 0.5
+    if fmt != "mp3":
+        # These readers seek past the cover instead of reading it
+        assert timings[True] < timings[False] / 3
@@ -0,0 +1,76 @@
+import pytest
+
+from playback_engine import EnginePlayer, FakePlaybackEngine, PlaybackEngine
+
+
+def test_interfaces_are_abstract():
+    with pytest.raises(TypeError):
+        EnginePlayer()
+    with pytest.raises(TypeError):
+        PlaybackEngine()
+
+
+def test_fake_player_reports_length_time_and_end():
+    engine = FakePlaybackEngine(lengths={"a.mp3": 1000}, tick_ms=100)
+    player = engine.create_player()
+    events = []
+    player.on_length = lambda ms: events.append(("length", ms))
+    player.on_time = lambda ms: events.append(("time", ms))
+    player.on_end = lambda: events.append(("end",))
+    player.on_playing = lambda: events.append(("playing",))
+
+    player.load("a.mp3")
+    assert player.get_length() == 0  # unknown until playback starts
+    assert player.play() == 0
+    assert events[:2] == [("length", 1000), ("playing",)]
+    engine.advance(1000)
+    assert events[-1] == ("end",)
+    assert [e[1] for e in events if e[0] == "time"] == list(range(100, 1000, 100))
+    assert not player.is_playing()
+
+
+def test_fake_player_pause_toggles_and_seek_clamps():
+    engine = FakePlaybackEngine(default_length_ms=5000)
+    player = engine.create_player()
+    player.load("a.mp3")
+    player.play()
+    player.pause()
+    engine.advance(1000)
+    assert player.get_time() == 0
+    player.pause()
+    engine.advance(1000)
+    assert player.get_time() == 1000
+    player.set_time(99999)
+    assert player.get_time() == 5000
+
+
+def test_controller_plays_through_playlist(controller, engine):
+    ended = []
+    controller.song_ended_signal.connect(lambda: ended.append(controller.current_index))
+    controller.song_ended_signal.connect(controller.play_next)
+    controller.set_playlist(["a.mp3", "b.mp3", "c.mp3"])
+    controller.play_song(0)
+    assert controller.get_length() == 10000
+    engine.advance(10000)
+    assert controller.current_index == 1
+    engine.advance(10000)
+    assert controller.current_index == 2
+    assert ended == [0, 1]
+
+
+def test_controller_seek_is_applied_on_leading_edge(controller, engine):
+    controller.set_playlist(["a.mp3"])
+    controller.play_song(0)
+    controller.seek(500)  # per mille of the track
+    assert controller.get_time() == 5000
+
+
+def test_controllers_share_one_engine(engine):
+    from player_controller import PlayerController
+    first, second = PlayerController(engine), PlayerController(engine)
+    try:
+        assert len(engine.players) == 4
+    finally:
+        first.cleanup()
+        second.cleanup()
+    assert engine.players == []
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from shuffle_order import ShuffleOrder
+
+
+def _check(order, members):
+    assert len(order) == len(members)
+    assert all(key in order for key in members)
+    # Every live key is drawn exactly once per cycle
+    live = [k for k in order._order if k != 0xFFFFFFFF]
+    assert sorted(live) == sorted(members)
+    if order._pos is not None:
+        for key, pos in order._pos.items():
+            assert order._order[pos] == key
+
+
+def test_cycle_visits_every_key_once():
+    order = ShuffleOrder(range(1, 101), random.Random(1))
+    seen = []
+    while (key := order.next()) is not None:
+        seen.append(key)
+    assert sorted(seen) == list(range(1, 101))
+
+
+def test_previous_walks_back_through_history():
+    order = ShuffleOrder(range(1, 21), random.Random(2))
+    played = [order.next() for _ in range(10)]
+    assert [order.previous() for _ in range(9)] == played[-2::-1]
+    assert order.previous() is None
+    assert order.next() == played[1]
+
+
+def test_peek_matches_next():
+    order = ShuffleOrder(range(1, 51), random.Random(3))
+    order.next()
+    upcoming = order.peek(5)
+    assert [order.next() for _ in range(5)] == upcoming
+
+
+def test_new_cycle_does_not_repeat_current():
+    for seed in range(50):
+        order = ShuffleOrder(range(1, 4), random.Random(seed))
+        while order.next() is not None:
+            pass
+        last = order.current()
+        order.new_cycle()
+        assert order.next() != last
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_random_edits_keep_order_consistent(seed):
+    rng = random.Random(seed)
+    members = set(range(1, rng.randint(2, 60)))
+    order = ShuffleOrder(sorted(members), random.Random(seed))
+    next_key = max(members) + 1
+    for _ in range(80):
+        op = rng.random()
+        if op < 0.35:
+            key = order.next()
+            if key is None:
+                order.new_cycle()
+            else:
+                assert key in members
+        elif op < 0.5:
+            order.previous()
+        elif op < 0.65:
+            order.add(next_key)
+            members.add(next_key)
+            next_key += 1
+        elif op < 0.85 and members:
+            key = rng.choice(sorted(members))
+            order.remove(key)
+            members.discard(key)
+            assert key not in order
+        elif members:
+            key = rng.choice(sorted(members))
+            order.jump(key)
+            assert order.current() == key
+        _check(order, members)
+    # Whatever the edits, the rest of the cycle never repeats a key
+    rest = []
+    while (key := order.next()) is not None:
+        rest.append(key)
+    assert len(rest) == len(set(rest))
@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from playlist_model import PlaylistModel
+from track_store import Playlist, move_blocks, normalize_ranges, row_ranges
+
+
+def _reference_move(items, rows, dest):
+    rows = sorted(set(rows))
+    moving = [items[r] for r in rows]
+    kept = [x for i, x in enumerate(items) if i not in set(rows)]
+    insert_at = dest - sum(1 for r in rows if r < dest)
+    return kept[:insert_at] + moving + kept[insert_at:]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_move_blocks_matches_reference(seed):
+    rng = random.Random(seed)
+    items = [f"t{i}" for i in range(rng.randint(1, 40))]
+    playlist = Playlist(paths=items)
+    rows = rng.sample(range(len(items)), rng.randint(1, len(items)))
+    dest = rng.randint(0, len(items))
+    for start, count, target in move_blocks(rows, dest):
+        playlist.move(start, count, target)
+    assert list(playlist) == _reference_move(items, rows, dest)
+
+
+def test_normalize_ranges_clips_and_merges():
+    assert normalize_ranges([(5, 3), (0, 2), (1, 2), (9, 10)], 12) == [(0, 3), (5, 3), (9, 3)]
+    assert row_ranges([4, 1, 2, 3, 8]) == [(1, 4), (8, 1)]
+
+
+def test_row_of_follows_edits():
+    playlist = Playlist(paths=["a", "b", "c", "d"])
+    ids = list(playlist.ids)
+    assert playlist.row_of(ids[2]) == 2
+    playlist.move(2, 1, 0)
+    assert playlist.row_of(ids[2]) == 0
+    playlist.remove(0, 1)
+    assert playlist.row_of(ids[2]) == -1
+
+
+def test_row_of_miss_does_not_reindex():
+    playlist = Playlist(paths=[f"/music/{i}.mp3" for i in range(10)])
+    gone = playlist.remove(0, 5)
+    assert playlist.row_of(gone[0]) == -1
+    index = playlist._rows
+    assert all(playlist.row_of(k) == -1 for k in gone)
+    assert playlist._rows is index
+    playlist.insert_ids(0, gone[:1])
+    assert playlist.row_of(gone[0]) == 0
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_row_of_matches_reference_under_edits(seed, monkeypatch):
+    rng = random.Random(seed)
+    paths = [f"/music/{rng.randrange(40)}.mp3" for _ in range(30)]
+    playlist = Playlist(paths=paths)
+    # Small logs exercise the drop-and-rebuild path too
+    monkeypatch.setattr(Playlist, "MAX_EDITS", 8 if seed % 2 else 1024)
+    for step in range(60):
+        op = rng.randrange(4)
+        n = len(playlist)
+        if op == 0:
+            playlist.insert(rng.randint(0, n), [f"/music/{rng.randrange(40)}.mp3"
+                                                for _ in range(rng.randint(1, 3))])
+        elif op == 1 and n:
+            playlist.remove(rng.randrange(n), rng.randint(1, 3))
+        elif op == 2 and n:
+            start = rng.randrange(n)
+            count = rng.randint(1, n - start)
+            playlist.move(start, count, rng.choice(
+                [d for d in range(n + 1) if not start <= d <= start + count] or [start]))
+        elif op == 3 and n:
+            playlist.remove_ranges(normalize_ranges(
+                [(rng.randrange(n), rng.randint(1, 2)) for _ in range(2)], n))
+        # Look up only now and then, so hints are remapped through several edits
+        if step % 5:
+            continue
+        ids = list(playlist.ids)
+        for track_id in set(ids) | set(range(5)):
+            row = playlist.row_of(track_id)
+            if track_id in ids:
+                assert ids[row] == track_id
+            else:
+                assert row == -1
+            assert playlist.has_track(track_id) == (track_id in ids)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_random_controller_edits_track_reference(seed, controller, engine):
+    rng = random.Random(seed)
+    model = PlaylistModel()
+    controller.attach_model(model)
+    reference = [f"/music/{i}.mp3" for i in range(rng.randint(1, 30))]
+    controller.set_playlist(reference)
+    current = rng.randrange(len(reference))
+    controller.play_song(current)
+    current_path = reference[current]
+    fresh = len(reference)
+    for _ in range(20):
+        op = rng.random()
+        if op < 0.4 and reference:
+            rows = rng.sample(range(len(reference)), rng.randint(1, min(5, len(reference))))
+            dest = rng.randint(0, len(reference))
+            controller.move_rows(rows, dest)
+            reference = _reference_move(reference, rows, dest)
+        elif op < 0.7:
+            row = rng.randint(0, len(reference))
+            paths = [f"/music/{fresh + i}.mp3" for i in range(rng.randint(1, 3))]
+            fresh += len(paths)
+            controller.insert_tracks(row, paths)
+            reference[row:row] = paths
+        elif reference:
+            rows = rng.sample(range(len(reference)), rng.randint(1, min(4, len(reference))))
+            controller.remove_tracks(rows)
+            doomed = set(rows)
+            if current_path is not None and reference.index(current_path) in doomed:
+                current_path = None
+            reference = [p for i, p in enumerate(reference) if i not in doomed]
+        assert list(controller.playlist) == reference
+        assert model.rowCount() == len(reference)
+        if current_path is None:
+            assert controller.current_index == -1
+        else:
+            assert controller.get_current_song_path() == current_path
+
+
+def test_reorder_playlist_resets_attached_model(controller):
+    model = PlaylistModel()
+    controller.attach_model(model)
+    controller.set_playlist(["a", "b", "c", "d"])
+    controller.play_song(3)
+    controller.reorder_playlist(["d", "c"])
+    assert model.rowCount() == 2
+    assert [model.path_at(r) for r in range(model.rowCount())] == ["d", "c"]
+    assert controller.current_index == 0
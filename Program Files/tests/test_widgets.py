@@ -0,0 +1,85 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QWidget
+
+from audio_controller import AudioController
+from blur_overlay import WindowBlurOverlay
+from playlist_model import PlaylistModel
+from ui_builder import UIBuilder
+from widgets import ReorderablePlaylist
+
+
+def _view(qapp, count=5):
+    model = PlaylistModel()
+    model.append_tracks([f"/music/{i}.mp3" for i in range(count)])
+    view = ReorderablePlaylist(model=model)
+    view.selectionModel().select(model.index(1, 0), view.selectionModel().SelectionFlag.Select)
+    return view
+
+
+def test_delete_emits_selected_ranges_when_connected(qapp):
+    view = _view(qapp)
+    requests = []
+    view.delete_requested.connect(requests.append)
+    QTest.keyClick(view, Qt.Key.Key_Delete)
+    assert requests == [[(1, 1)]]
+
+
+def test_delete_falls_through_without_receiver(qapp, monkeypatch):
+    view = _view(qapp)
+    handled = []
+    monkeypatch.setattr(ReorderablePlaylist.__mro__[1], "keyPressEvent",
+                        lambda self, event: handled.append(event.key()))
+    QTest.keyClick(view, Qt.Key.Key_Delete)
+    assert handled == [Qt.Key.Key_Delete]
+
+
+def test_position_updates_follow_window_visibility(qapp, engine):
+    window = QWidget()
+    window.controller = AudioController(engine)
+    try:
+        builder = UIBuilder.__new__(UIBuilder)
+        builder.parent = window
+        builder._watch_window_visibility()
+        publisher = window.controller.position_publisher
+        assert not publisher._visible
+        window.show()
+        qapp.processEvents()
+        assert publisher._visible
+        window.hide()
+        qapp.processEvents()
+        assert not publisher._visible
+    finally:
+        window.controller.cleanup()
+
+
+def test_blur_snapshot_survives_repaints(qapp, monkeypatch):
+    window = QWidget()
+    window.resize(320, 240)
+    window.show()
+    overlay = WindowBlurOverlay(window)
+    renders = []
+    render = overlay._render_blur
+    monkeypatch.setattr(overlay, "_render_blur", lambda: renders.append(1) or render())
+    try:
+        overlay.show_over()
+        overlay.hide()
+        # Animations repaint the window constantly; none of that is a content change
+        for _ in range(5):
+            window.update()
+            qapp.processEvents()
+        overlay.show_over()
+        assert len(renders) == 1
+
+        overlay.hide()
+        overlay.invalidate()
+        overlay.show_over()
+        assert len(renders) == 2
+
+        overlay.hide()
+        window.resize(400, 300)
+        qapp.processEvents()
+        overlay.show_over()
+        assert len(renders) == 3
+    finally:
+        window.close()
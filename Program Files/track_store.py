@@ -0,0 +1,368 @@
+# track_store.py - Compact columnar storage for playlist tracks
+import os
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class _StringPool:
+    """Interns repeated strings (folders, artists, albums) behind small ints."""
+
+    def __init__(self):
+        self.values: List[str] = [""]
+        self._ids: Dict[str, int] = {"": 0}
+
+    def lookup(self, value: str) -> int | None:
+        return self._ids.get(value)
+
+    def intern(self, value: str) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self.values.append(value)
+            self._ids[value] = value_id
+        return value_id
+
+
+class TrackStore:
+    """Columnar track table addressed by integer track IDs.
+
+    A path is split into an interned folder plus a basename, so a library of
+    albums stores each folder string once. Metadata lives in parallel columns:
+    artist and album are interned, durations are packed into an array, and
+    only titles are kept per track.
+    """
+
+    def __init__(self):
+        self._folders = _StringPool()
+        self._tags = _StringPool()
+        self._folder_ids = array("I")
+        self._names: List[str] = []
+        self._titles: List[str | None] = []
+        self._artists = array("I")
+        self._albums = array("I")
+        self._durations = array("I")
+        # Per-folder name -> track id; reuses the basename objects in _names
+        self._lookup: Dict[int, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, path: str) -> int:
+        """Return the ID for ``path``, adding the track if it is new."""
+        folder, name = os.path.split(path)
+        folder_id = self._folders.intern(folder)
+        names = self._lookup.setdefault(folder_id, {})
+        track_id = names.get(name)
+        if track_id is None:
+            track_id = len(self._names)
+            names[name] = track_id
+            self._folder_ids.append(folder_id)
+            self._names.append(name)
+            self._titles.append(None)
+            self._artists.append(0)
+            self._albums.append(0)
+            self._durations.append(0)
+        return track_id
+
+    def add_many(self, paths: Iterable[str]) -> array:
+        return array("I", (self.add(p) for p in paths))
+
+    def id_for(self, path: str) -> int | None:
+        folder, name = os.path.split(path)
+        folder_id = self._folders.lookup(folder)
+        if folder_id is None:
+            return None
+        return self._lookup.get(folder_id, {}).get(name)
+
+    def path(self, track_id: int) -> str:
+        return os.path.join(self._folders.values[self._folder_ids[track_id]], self._names[track_id])
+
+    def name(self, track_id: int) -> str:
+        return self._names[track_id]
+
+    def title(self, track_id: int) -> str | None:
+        return self._titles[track_id]
+
+    def duration(self, track_id: int) -> int:
+        return self._durations[track_id]
+
+    def set_metadata(self, track_id: int, metadata: Dict[str, Any]) -> None:
+        self._titles[track_id] = metadata.get("title") or None
+        self._artists[track_id] = self._tags.intern(metadata.get("artist") or "")
+        self._albums[track_id] = self._tags.intern(metadata.get("album") or "")
+        self._durations[track_id] = max(0, int(metadata.get("duration") or 0))
+
+    def update_metadata(self, batch: Iterable[Tuple[str, Dict[str, Any]]]) -> List[int]:
+        """Apply a metadata_batch_ready payload; returns the IDs that were updated."""
+        updated = []
+        for path, metadata in batch:
+            track_id = self.id_for(path)
+            if track_id is not None:
+                self.set_metadata(track_id, metadata)
+                updated.append(track_id)
+        return updated
+
+    def metadata(self, track_id: int) -> Dict[str, Any]:
+        return {
+            "title": self._titles[track_id] or "",
+            "artist": self._tags.values[self._artists[track_id]],
+            "album": self._tags.values[self._albums[track_id]],
+            "duration": self._durations[track_id],
+        }
+
+
+def move_blocks(rows: Iterable[int], dest: int) -> List[Tuple[int, int, int]]:
+    """Split moving ``rows`` to before ``dest`` into contiguous block moves.
+
+    Returns (start, count, dest) steps to apply in order; each step is in the
+    coordinates left by the previous one, with ``dest`` in pre-move terms as
+    for QAbstractItemModel.moveRows. Rows keep their relative order.
+    """
+    rows = sorted(set(r for r in rows if r >= 0))
+    blocks: List[List[int]] = []
+    for r in rows:
+        # Split runs at the drop point so every block is wholly above or below it
+        if blocks and blocks[-1][1] == r - 1 and r != dest:
+            blocks[-1][1] = r
+        else:
+            blocks.append([r, r])
+
+    steps = []
+    # Blocks above the drop point, nearest first, stack up just before it
+    target = dest
+    for start, end in reversed([b for b in blocks if b[1] < dest]):
+        count = end - start + 1
+        if end + 1 != target:
+            steps.append((start, count, target))
+        target -= count
+    # Blocks below the drop point, nearest first, follow on after it
+    target = dest
+    for start, end in [b for b in blocks if b[1] >= dest]:
+        count = end - start + 1
+        if start != target:
+            steps.append((start, count, target))
+        target += count
+    return steps
+
+
+def row_after_move(row: int, start: int, count: int, dest: int) -> int:
+    """Where ``row`` ends up after moving ``count`` rows from ``start`` to before ``dest``."""
+    if row < 0:
+        return row
+    if start <= row < start + count:
+        return row - start + (dest - count if dest > start else dest)
+    if dest > start and start + count <= row < dest:
+        return row - count
+    if dest < start and dest <= row < start:
+        return row + count
+    return row
+
+
+def row_after_insert(row: int, at: int, count: int) -> int:
+    return row + count if row >= at else row
+
+
+def row_after_remove(row: int, start: int, count: int) -> int:
+    """Where ``row`` ends up after removing a range, or -1 if it was removed."""
+    if row < start:
+        return row
+    if row < start + count:
+        return -1
+    return row - count
+
+
+def row_ranges(rows: Iterable[int]) -> List[Tuple[int, int]]:
+    """Collapse rows into sorted, merged (start, count) ranges."""
+    ranges: List[List[int]] = []
+    for r in sorted(set(rows)):
+        if ranges and ranges[-1][0] + ranges[-1][1] == r:
+            ranges[-1][1] += 1
+        else:
+            ranges.append([r, 1])
+    return [(start, count) for start, count in ranges]
+
+
+def normalize_ranges(ranges: Iterable[Tuple[int, int]], length: int) -> List[Tuple[int, int]]:
+    """Clip (start, count) ranges to ``length`` rows, then sort and merge them."""
+    merged: List[List[int]] = []
+    for start, count in sorted((max(0, s), min(s + c, length)) for s, c in ranges):
+        if start >= count:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], count)
+        else:
+            merged.append([start, count])
+    return [(start, end - start) for start, end in merged]
+
+
+def row_after_remove_ranges(row: int, ranges: Iterable[Tuple[int, int]]) -> int:
+    """Like row_after_remove() for sorted, disjoint ranges."""
+    if row < 0:
+        return row
+    removed = 0
+    for start, count in ranges:
+        if row < start:
+            break
+        if row < start + count:
+            return -1
+        removed += count
+    return row - removed
+
+
+class Playlist:
+    """Ordered sequence of track IDs over a TrackStore.
+
+    Indexing and iteration yield paths, so code written against the old
+    ``list[str]`` playlist keeps working; ``ids`` exposes the packed order.
+    """
+
+    # Edits remembered for remapping row hints before the index is dropped
+    MAX_EDITS = 1024
+
+    def __init__(self, store: TrackStore | None = None, paths: Iterable[str] = ()):
+        self.store = store if store is not None else TrackStore()
+        self.ids = self.store.add_many(paths)
+        # track id -> occurrences, so membership never needs the row index
+        self._counts: Dict[int, int] = {}
+        self._count(self.ids, 1)
+        # track id -> (row, len(_edits) when that row was right); row_of maps a
+        # hint through the edits made since, so an edit costs O(1), not a re-index
+        self._rows: Dict[int, Tuple[int, int]] = {}
+        self._edits: List[Tuple[Any, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __bool__(self) -> bool:
+        return len(self.ids) > 0
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.store.path(i) for i in self.ids[row]]
+        return self.store.path(self.ids[row])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.store.path(i) for i in self.ids)
+
+    def track_id(self, row: int) -> int:
+        return self.ids[row]
+
+    def has_track(self, track_id: int) -> bool:
+        return track_id in self._counts
+
+    def extend(self, paths: Iterable[str]) -> None:
+        start = len(self.ids)
+        ids = self.store.add_many(paths)
+        self.ids.extend(ids)
+        self._count(ids, 1)
+        self._hint(ids, start)
+
+    def replace(self, paths: Iterable[str]) -> None:
+        self.ids[:] = self.store.add_many(paths)
+        self._counts.clear()
+        self._count(self.ids, 1)
+        self._rows.clear()
+        self._edits.clear()
+
+    def insert_ids(self, row: int, ids: array) -> None:
+        self.ids[row:row] = ids
+        self._count(ids, 1)
+        self._log(row_after_insert, row, len(ids))
+        self._hint(ids, row)
+
+    def insert(self, row: int, paths: Iterable[str]) -> int:
+        """Insert tracks before ``row``; returns how many were inserted."""
+        ids = self.store.add_many(paths)
+        self.insert_ids(row, ids)
+        return len(ids)
+
+    def remove(self, start: int, count: int) -> array:
+        """Remove ``count`` rows from ``start``; returns their track IDs."""
+        removed = self.ids[start:start + count]
+        del self.ids[start:start + count]
+        self._count(removed, -1)
+        self._log(row_after_remove, start, count)
+        return removed
+
+    def remove_ranges(self, ranges: Iterable[Tuple[int, int]]) -> int:
+        """Remove sorted, disjoint (start, count) ranges in one pass; returns rows removed."""
+        ranges = list(ranges)
+        ids = self.ids
+        kept = array("I")
+        prev = 0
+        for start, count in ranges:
+            kept.extend(ids[prev:start])
+            self._count(ids[start:start + count], -1)
+            prev = start + count
+        removed = len(ids) - len(kept) - (len(ids) - prev)
+        if removed:
+            kept.extend(ids[prev:])
+            ids[:] = kept
+            self._log(row_after_remove_ranges, ranges)
+        return removed
+
+    def move(self, start: int, count: int, dest: int) -> int:
+        """Move a block so it lands before ``dest`` (pre-move row); returns its new start."""
+        block = self.ids[start:start + count]
+        del self.ids[start:start + count]
+        insert_at = dest - count if dest > start else dest
+        self.ids[insert_at:insert_at] = block
+        self._log(row_after_move, start, count, dest)
+        return insert_at
+
+    def index_of(self, track_id: int, start: int = 0) -> int:
+        """Row of the first occurrence of ``track_id`` at or after ``start``, or -1."""
+        try:
+            return self.ids.index(track_id, start)
+        except ValueError:
+            return -1
+
+    def row_of(self, track_id: int) -> int:
+        """Row holding ``track_id``, or -1; O(edits since its hint), not O(n)."""
+        if track_id not in self._counts:
+            return -1
+        hint = self._rows.get(track_id)
+        if hint is not None:
+            row, seen = hint
+            edits = self._edits
+            for i in range(seen, len(edits)):
+                row = edits[i][0](row, *edits[i][1:])
+                if row < 0:
+                    break
+            if 0 <= row < len(self.ids) and self.ids[row] == track_id:
+                if seen != len(edits):
+                    self._rows[track_id] = (row, len(edits))
+                return row
+        # No usable hint, e.g. that occurrence was removed: re-index once
+        ids = self.ids
+        self._edits.clear()
+        self._rows = {ids[r]: (r, 0) for r in range(len(ids) - 1, -1, -1)}
+        return self._rows[track_id][0]
+
+    def _count(self, ids: Iterable[int], delta: int) -> None:
+        counts = self._counts
+        for track_id in ids:
+            n = counts.get(track_id, 0) + delta
+            if n > 0:
+                counts[track_id] = n
+            else:
+                del counts[track_id]
+                self._rows.pop(track_id, None)
+
+    def _hint(self, ids: Iterable[int], start: int) -> None:
+        """Record rows for freshly added ids, keeping any existing hint."""
+        if not self._rows:
+            return
+        seen = len(self._edits)
+        rows = self._rows
+        for offset, track_id in enumerate(ids):
+            if track_id not in rows:
+                rows[track_id] = (start + offset, seen)
+
+    def _log(self, remap, *args) -> None:
+        if len(self._edits) >= self.MAX_EDITS:
+            # Older hints would take too long to remap; rebuild on next use
+            self._edits.clear()
+            self._rows.clear()
+            return
+        self._edits.append((remap,) + args)
@@ -4,7 +4,7 @@
 import os
 import sys
 from PyQt6.QtWidgets import (
-    QWidget, QLabel, QPushButton, QListWidget, QSlider, QHBoxLayout, 
+    QWidget, QLabel, QPushButton, QListView, QSlider, QHBoxLayout, 
     QSizePolicy, QVBoxLayout, QGraphicsBlurEffect, QGraphicsDropShadowEffect,
     QGraphicsOpacityEffect, QSpacerItem
 )
@@ -12,6 +12,13 @@ from PyQt6.QtGui import QPixmap, QIcon, QFont, QColor
 from PyQt6.QtCore import Qt, QSize, QTimer
 
 from widgets import ScrollingLabel, GlowButton, ReorderablePlaylist, PulsingDelegate, AlbumArtWidget
+from playlist_model import PlaylistModel
+from player_controller import PlayerController
+from audio_controller import AudioController
+from workers.background_blur import BackgroundBlurManager
+from blur_overlay import WindowBlurOverlay
+from workers.art_loader import AlbumArtLoader
+from workers.metadata_worker import MetadataManager
 from styles import (
     SIDEBAR_BG_COLOR, SIDEBAR_HOVER_COLOR, SPOTIFY_GREEN, SPOTIFY_GREEN_HOVER, WHITE, BLACK,
     ICON_PLAY, ICON_PAUSE, ICON_NEXT, ICON_PREV, ICON_BRIGHTNESS, ICON_APP,
@@ -41,6 +48,28 @@ class UIBuilder:
         self.parent = parent
         self.central_widget = parent.centralWidget()
         self.color_settings = parent.color_settings
+
+    def _player_controller(self):
+        """The parent's PlayerController, if it has one.
+
+        ``parent.controller`` is the AudioController, which owns no playlist,
+        so the PlayerController is looked up as ``parent.player_controller``.
+        """
+        controller = getattr(self.parent, 'player_controller', None)
+        return controller if isinstance(controller, PlayerController) else None
+
+    def _metadata_manager(self):
+        """The parent's MetadataManager, if it has one; looked up on use, as it may start later."""
+        manager = getattr(self.parent, 'metadata_manager', None)
+        return manager if isinstance(manager, MetadataManager) else None
+
+    def _on_visible_range_changed(self, first: int, last: int):
+        manager = self._metadata_manager()
+        if manager is None:
+            return
+        model = self.parent.playlist_model
+        paths = [model.path_at(row) for row in range(first, last + 1)] if first >= 0 else []
+        manager.set_visible_files(p for p in paths if p)
     
     def setup_ui(self):
         """Main UI setup coordinator - calls all setup methods in order"""
@@ -57,6 +86,13 @@ class UIBuilder:
         self.fix_color_button_parent()
         self.position_color_below_brightness()  # ADD this line
         self.parent.ensure_proper_layer_order()
+        self._watch_window_visibility()
+
+    def _watch_window_visibility(self):
+        """Stop position updates while the main window is hidden or minimized."""
+        controller = getattr(self.parent, 'controller', None)
+        if isinstance(controller, AudioController):
+            controller.position_publisher.watch_window(self.parent)
 
     
     def _setup_background_layers(self):
@@ -72,6 +108,13 @@ class UIBuilder:
         self.parent.bg_blur_label_2.setScaledContents(True)
         self.parent.bg_blur_label_2.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
 
+        # Blurred backgrounds are built off-thread; the labels only rescale cached levels on resize
+        self.parent.background_blur = BackgroundBlurManager(self.parent)
+        self.parent.background_blur.attach(self.parent.bg_blur_label_1)
+        self.parent.background_blur.attach(self.parent.bg_blur_label_2)
+        # Downsampled snapshot shown behind modal popups; set_blur shows and hides it
+        self.parent.window_blur = WindowBlurOverlay(self.parent)
+
         self.parent.dark_overlay = QLabel(self.central_widget)
         self.parent.dark_overlay.setGeometry(0, 0, self.parent.width(), self.parent.height())
         self.parent.dark_overlay.setStyleSheet("background-color: rgba(0, 0, 0, 150);")
@@ -176,13 +219,27 @@ class UIBuilder:
 
         button_container.setLayout(button_layout)
 
-        self.parent.playlist_widget = ReorderablePlaylist(on_reorder_callback=self.parent.sync_playlist_order)
-        self.parent.playlist_widget.setDragDropMode(QListWidget.DragDropMode.InternalMove)
+        self.parent.playlist_model = PlaylistModel()
+        # With a PlayerController, drags become incremental row moves instead of a full re-sync
+        controller = self._player_controller()
+        if controller is not None:
+            controller.attach_model(self.parent.playlist_model)
+            controller.metadata_manager = self._metadata_manager()
+            self.parent.playlist_widget = ReorderablePlaylist(on_move_rows=controller.move_rows,
+                                                              model=self.parent.playlist_model)
+            self.parent.playlist_widget.delete_requested.connect(controller.remove_ranges)
+        else:
+            self.parent.playlist_widget = ReorderablePlaylist(on_reorder_callback=self.parent.sync_playlist_order,
+                                                              model=self.parent.playlist_model)
+        self.parent.playlist_widget.setDragDropMode(QListView.DragDropMode.InternalMove)
         self.parent.playlist_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.parent.playlist_widget.customContextMenuRequested.connect(self.parent.show_playlist_context_menu)
-        self.parent.playlist_widget.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.parent.playlist_widget.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
         self.parent.playlist_widget.setAlternatingRowColors(True)
 
+        # Let the metadata queue favour the rows that are actually on screen
+        self.parent.playlist_widget.visible_range_changed.connect(self._on_visible_range_changed)
+
         # Ensure PulsingDelegate is set with correct lambda for current index
         self.parent.playlist_widget.setItemDelegate(PulsingDelegate(
             self.parent.playlist_widget, 
@@ -202,6 +259,15 @@ class UIBuilder:
         self.parent.main_layout = QVBoxLayout()
 
         self.parent.album_art_label = AlbumArtWidget()
+        # Covers are decoded off the GUI thread and cached; on art_ready, show art_loader.pixmap(path, size)
+        self.parent.art_loader = AlbumArtLoader(self.parent)
+        controller = self._player_controller()
+        if controller is not None:
+            controller.art_loader = self.parent.art_loader
+        # A new track changes the window under the popup blur; cover loads follow every track change
+        self.parent.art_loader.art_ready.connect(lambda _path: self.parent.window_blur.invalidate())
+        if controller is not None:
+            controller.track_changed_signal.connect(lambda _index: self.parent.window_blur.invalidate())
 
         # Add a soft, more visible drop shadow effect to the album art
         soft_shadow = QGraphicsDropShadowEffect(self.parent.album_art_label)
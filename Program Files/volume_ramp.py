@@ -0,0 +1,153 @@
+# volume_ramp.py - Volume ramps driven by a single background scheduler
+import math
+import threading
+import time
+from array import array
+from typing import Callable, List
+
+
+class _Ramp:
+    __slots__ = ("active", "player", "start", "end", "t0", "duration", "rising", "last", "on_done")
+
+    def __init__(self):
+        self.active = False
+        self.player = None
+        self.start = 0
+        self.end = 0
+        self.t0 = 0.0
+        self.duration = 1.0
+        self.rising = True
+        self.last = -1
+        self.on_done: Callable[[], None] | None = None
+
+
+class RampScheduler:
+    """Runs every volume ramp from one thread on a fixed high-resolution tick.
+
+    Ramps live in a small preallocated slot table and follow an equal-power
+    curve that is computed once, so a step is table lookups plus a
+    set_volume() call when the integer volume actually changes. Nothing runs
+    on the GUI thread, so fades stay smooth while the UI is busy. on_done
+    callbacks run on the scheduler thread.
+    """
+
+    MAX_RAMPS = 4
+    CURVE_POINTS = 1025
+
+    def __init__(self, step_ms: int = 10):
+        self.step = step_ms / 1000.0
+        last = self.CURVE_POINTS - 1
+        # sin(pi/2 * x): fade-in gain at x, fade-out gain at 1 - x
+        self._curve = array("d", (math.sin(math.pi / 2 * i / last) for i in range(self.CURVE_POINTS)))
+        self._slots: List[_Ramp] = [_Ramp() for _ in range(self.MAX_RAMPS)]
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def ramp(self, player, start: int, end: int, duration_ms: int,
+             on_done: Callable[[], None] | None = None) -> bool:
+        """Ramp ``player`` from ``start`` to ``end`` volume; replaces any ramp on it."""
+        with self._lock:
+            if self._closed:
+                return False
+            self._cancel_locked(player)
+            slot = next((r for r in self._slots if not r.active), None)
+            if slot is None:
+                return False
+            slot.player = player
+            slot.start = start
+            slot.end = end
+            slot.rising = end >= start
+            slot.duration = max(duration_ms, 1) / 1000.0
+            slot.t0 = time.perf_counter()
+            slot.last = -1
+            slot.on_done = on_done
+            slot.active = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="volume-ramps", daemon=True)
+                self._thread.start()
+            self._wake.set()
+        return True
+
+    def retarget(self, player, start: int | None = None, end: int | None = None):
+        """Change the endpoints of the ramp on ``player``, e.g. after a volume change."""
+        with self._lock:
+            for r in self._slots:
+                if r.active and r.player is player:
+                    if start is not None:
+                        r.start = start
+                    if end is not None:
+                        r.end = end
+
+    def cancel(self, player) -> bool:
+        """Stop the ramp on ``player`` without calling on_done; True if one was running."""
+        with self._lock:
+            return self._cancel_locked(player)
+
+    def is_ramping(self, player) -> bool:
+        with self._lock:
+            return any(r.active and r.player is player for r in self._slots)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for r in self._slots:
+                r.active = False
+                r.player = r.on_done = None
+            self._wake.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _cancel_locked(self, player) -> bool:
+        found = False
+        for r in self._slots:
+            if r.active and r.player is player:
+                r.active = False
+                r.player = r.on_done = None
+                found = True
+        return found
+
+    def _run(self):
+        curve = self._curve
+        last_point = self.CURVE_POINTS - 1
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if self._closed:
+                    return
+                now = time.perf_counter()
+                for r in self._slots:
+                    if not r.active:
+                        continue
+                    x = (now - r.t0) / r.duration
+                    done = x >= 1.0
+                    i = last_point if done else int(x * last_point)
+                    if r.rising:
+                        volume = r.start + round((r.end - r.start) * curve[i])
+                    else:
+                        volume = r.end + round((r.start - r.end) * curve[last_point - i])
+                    if volume != r.last:
+                        r.last = volume
+                        try:
+                            r.player.set_volume(volume)
+                        except Exception as e:
+                            print(f"Volume ramp error: {e}")
+                            done = True
+                    if done:
+                        on_done = r.on_done
+                        r.active = False
+                        r.player = r.on_done = None
+                        if on_done is not None:
+                            on_done()
+                # Re-check after callbacks, which may have started new ramps
+                busy = False
+                for r in self._slots:
+                    if r.active:
+                        busy = True
+                        break
+                if not busy:
+                    self._wake.clear()
+                    continue
+            time.sleep(self.step)
@@ -1,7 +1,10 @@
-from PyQt6.QtWidgets import QLabel, QPushButton, QListWidget, QStyledItemDelegate, QGraphicsDropShadowEffect, QAbstractScrollArea, QStyle, QStyleOptionViewItem, QWidget
-from PyQt6.QtCore import QTimer, Qt, QEvent, QSize, pyqtSignal, pyqtSlot, QPointF, QRectF
+from PyQt6.QtWidgets import QLabel, QPushButton, QListView, QStyledItemDelegate, QGraphicsDropShadowEffect, QAbstractScrollArea, QStyle, QStyleOptionViewItem, QWidget
+from PyQt6.QtCore import QTimer, Qt, QEvent, QSize, pyqtSignal, pyqtSlot, QPointF, QRectF, QItemSelection, QItemSelectionModel
 from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPainterPath, QBrush, QPixmap
 
+from playlist_model import PlaylistModel
+from track_store import normalize_ranges
+
 class ShadowLabel(QLabel):
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -86,14 +89,92 @@ class ScrollingLabel(QLabel):
                 painter.drawText(x, y, full_scroll)
                 x += text_width
 
-class ReorderablePlaylist(QListWidget):
-    def __init__(self, parent=None, on_reorder_callback=None):
+class ReorderablePlaylist(QListView):
+    """Playlist view backed by a PlaylistModel; rows are dragged to reorder."""
+    visible_range_changed = pyqtSignal(int, int)  # first row, last row
+    delete_requested = pyqtSignal(list)  # selected rows as sorted (start, count) ranges
+
+    def __init__(self, parent=None, on_reorder_callback=None, model=None, on_move_rows=None):
         super().__init__(parent)
         self.on_reorder_callback = on_reorder_callback
+        # on_move_rows(rows, dest) performs the move itself (e.g. PlayerController.move_rows)
+        self.on_move_rows = on_move_rows
+        # Uniform rows let the view lay out 100k+ rows without measuring each one
+        self.setUniformItemSizes(True)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        # Coalesce scroll/resize bursts into one viewport report
+        self._visible_range = (-1, -1)
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(50)
+        self._visible_timer.timeout.connect(self._emit_visible_range)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_visible_range)
+        self.setModel(model if model is not None else PlaylistModel(parent=self))
+    def setModel(self, model):
+        super().setModel(model)
+        model.rowsInserted.connect(self._schedule_visible_range)
+        model.modelReset.connect(self._schedule_visible_range)
+    def count(self):
+        return self.model().rowCount()
+    def visible_range(self):
+        """Return (first, last) rows in the viewport, or (-1, -1) if empty."""
+        if self.count() == 0:
+            return (-1, -1)
+        viewport = self.viewport().rect()
+        first = self.indexAt(viewport.topLeft()).row()
+        last = self.indexAt(viewport.bottomLeft()).row()
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = self.count() - 1
+        return (first, last)
+    def _schedule_visible_range(self, *args):
+        self._visible_timer.start()
+    def _emit_visible_range(self):
+        visible = self.visible_range()
+        if visible != self._visible_range:
+            self._visible_range = visible
+            self.visible_range_changed.emit(*visible)
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._schedule_visible_range()
+    def selected_ranges(self):
+        """Selected rows as merged (start, count) ranges, without listing each row."""
+        ranges = [(r.top(), r.bottom() - r.top() + 1) for r in self.selectionModel().selection()]
+        return normalize_ranges(ranges, self.count())
+    def keyPressEvent(self, event):
+        # Without a receiver, Delete keeps the view's default handling
+        if (event.key() == Qt.Key.Key_Delete and self.receivers(self.delete_requested) > 0
+                and self.selectionModel().hasSelection()):
+            self.delete_requested.emit(self.selected_ranges())
+            event.accept()
+            return
+        super().keyPressEvent(event)
+    def _drop_row(self, pos):
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return self.count()
+        rect = self.visualRect(index)
+        return index.row() + 1 if pos.y() > rect.center().y() else index.row()
     def dropEvent(self, event):
-        super().dropEvent(event)
-        if self.on_reorder_callback:
-            self.on_reorder_callback()
+        if event.source() is not self:
+            event.ignore()
+            return
+        rows = sorted(i.row() for i in self.selectionModel().selectedRows())
+        dest = self._drop_row(event.position().toPoint())
+        if self.on_move_rows:
+            moved = self.on_move_rows(rows, dest)
+        else:
+            moved = self.model().move_rows(rows, dest)
+        # The model already moved the rows; stop the drag source from deleting them
+        event.setDropAction(Qt.DropAction.IgnoreAction)
+        event.accept()
+        if moved:
+            first = dest - sum(1 for r in rows if r < dest)
+            selection = QItemSelection(self.model().index(first), self.model().index(first + len(rows) - 1))
+            self.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+            if self.on_reorder_callback:
+                self.on_reorder_callback()
 
 class GlowButton(QPushButton):
     def __init__(self, *args, glow_color=QColor(0, 255, 150, 180), **kwargs):
@@ -222,6 +303,9 @@ class AlbumArtWidget(QWidget):
         self.setFixedSize(220, 220)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         # No QGraphicsDropShadowEffect; we'll draw the shadow manually
+        # Blurred shadow, rebuilt only when (size, art size, device pixel ratio) changes
+        self._shadow = None
+        self._shadow_key = None
 
     def setPixmap(self, pixmap: QPixmap):
         self._pixmap = pixmap
@@ -231,19 +315,19 @@ class AlbumArtWidget(QWidget):
         self._pixmap = None
         self.update()
 
-    def paintEvent(self, event):
+    def _shadow_pixmap(self, art_w, art_h):
+        key = (self.width(), self.height(), art_w, art_h, self.devicePixelRatioF())
+        if key != self._shadow_key:
+            self._shadow = self._render_shadow(*key)
+            self._shadow_key = key
+        return self._shadow
+
+    @staticmethod
+    def _render_shadow(width, height, art_w, art_h, dpr):
         from PyQt6.QtWidgets import QGraphicsBlurEffect, QGraphicsScene, QGraphicsPixmapItem
         from PyQt6.QtGui import QRadialGradient
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        # Album art size
-        if self._pixmap:
-            art_w = self._pixmap.width()
-            art_h = self._pixmap.height()
-        else:
-            art_w = art_h = 180
-        x = (self.width() - art_w) // 2
-        y = (self.height() - art_h) // 2
+        x = (width - art_w) // 2
+        y = (height - art_h) // 2
         # Shadow parameters
         shadow_blur = 80
         shadow_alpha = 80
@@ -251,8 +335,9 @@ class AlbumArtWidget(QWidget):
         # Center the shadow ellipse just offset from the album art's bottom-right
         shadow_cx = x + art_w + shadow_radius // 2 - 10
         shadow_cy = y + art_h + shadow_radius // 2 - 10
-        # 1. Draw shadow shape onto a QPixmap
-        shadow_pixmap = QPixmap(self.width(), self.height())
+        # 1. Draw shadow shape onto a QPixmap at device resolution
+        shadow_pixmap = QPixmap(round(width * dpr), round(height * dpr))
+        shadow_pixmap.setDevicePixelRatio(dpr)
         shadow_pixmap.fill(Qt.GlobalColor.transparent)
         shadow_painter = QPainter(shadow_pixmap)
         shadow_painter.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -271,10 +356,27 @@ class AlbumArtWidget(QWidget):
         item.setGraphicsEffect(blur_effect)
         scene.addItem(item)
         blurred_shadow = QPixmap(shadow_pixmap.size())
+        blurred_shadow.setDevicePixelRatio(dpr)
         blurred_shadow.fill(Qt.GlobalColor.transparent)
         blur_painter = QPainter(blurred_shadow)
-        scene.render(blur_painter)
+        area = QRectF(0, 0, width, height)
+        scene.render(blur_painter, area, area)
         blur_painter.end()
+        return blurred_shadow
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # Album art size
+        if self._pixmap:
+            art_w = self._pixmap.width()
+            art_h = self._pixmap.height()
+        else:
+            art_w = art_h = 180
+        x = (self.width() - art_w) // 2
+        y = (self.height() - art_h) // 2
+        # 1-2. Blurred shadow, cached; a plain blit unless the geometry changed
+        blurred_shadow = self._shadow_pixmap(art_w, art_h)
         # 3. Draw the blurred shadow behind the album art
         painter.drawPixmap(0, 0, blurred_shadow)
         # 4. Draw album art
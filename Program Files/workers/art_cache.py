@@ -0,0 +1,125 @@
+from PyQt6.QtGui import QImage, QPixmap
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+import hashlib
+import os
+
+from workers.metadata_cache import MetadataCache, default_cache_path
+
+
+def default_art_dir() -> str:
+    """Return the thumbnail directory, next to the metadata cache."""
+    folder = os.path.join(os.path.dirname(default_cache_path()), "art")
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def default_index_path() -> str:
+    """Return the path -> art hash index location, next to the metadata cache."""
+    return os.path.join(os.path.dirname(default_cache_path()), "art_index.sqlite3")
+
+
+def art_hash(data: bytes) -> str:
+    """Content hash of raw cover bytes; tracks sharing a cover share the hash."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ArtIndex(MetadataCache):
+    """Persistent ``path -> art hash`` index keyed by (path, size, mtime_ns).
+
+    Reuses MetadataCache's storage with the hash as the value. An empty hash
+    records a track without a cover, so those are not parsed again either.
+    The index has its own database file next to the metadata cache: each
+    connection keeps a write transaction open between batched commits, so
+    sharing one file would lock the other writer out.
+    """
+
+    COMMIT_EVERY = 32
+    TABLE = "art_index"
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__(db_path or default_index_path())
+
+    @staticmethod
+    def _encode(value: str) -> str:
+        return value
+
+    @staticmethod
+    def _decode(data: str) -> str:
+        return data
+
+
+class ThumbnailStore:
+    """Scaled covers on disk, one PNG per (art hash, edge).
+
+    Files are named by content hash, so every track of an album shares one
+    set of thumbnails. Loading them never touches the audio file or its
+    full-size JPEG. Files are written to a temporary name and then renamed,
+    so a reader never sees a partial thumbnail.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or default_art_dir()
+
+    def _path(self, art: str, edge: int) -> str:
+        return os.path.join(self.directory, art[:2], f"{art}_{edge}.png")
+
+    def load(self, art: str, edges: Iterable[int]) -> Optional[Dict[int, QImage]]:
+        """Return ``{edge: QImage}`` if every edge is stored, else None."""
+        images: Dict[int, QImage] = {}
+        for edge in edges:
+            image = QImage(self._path(art, edge), "PNG")
+            if image.isNull():
+                return None
+            images[edge] = image
+        return images
+
+    def save(self, art: str, images: Dict[int, QImage]) -> None:
+        try:
+            os.makedirs(os.path.join(self.directory, art[:2]), exist_ok=True)
+            for edge, image in images.items():
+                path = self._path(art, edge)
+                tmp = path + ".tmp"
+                if image.save(tmp, "PNG"):
+                    os.replace(tmp, path)
+        except OSError as e:
+            # A full or read-only disk only costs a decode next time
+            print(f"Thumbnail store error (non-fatal): {e}")
+
+
+class PixmapCache:
+    """LRU of QPixmaps bounded by the bytes their pixels use. GUI thread only."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items: "OrderedDict[Hashable, Tuple[QPixmap, int]]" = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Optional[QPixmap]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key: Hashable, pixmap: QPixmap) -> None:
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        cost = pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+        self._items[key] = (pixmap, cost)
+        self.bytes += cost
+        # Always keep the newest entry, even if it alone exceeds the budget
+        while self.bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.bytes -= evicted
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.bytes = 0
@@ -0,0 +1,237 @@
+from PyQt6.QtCore import QBuffer, QByteArray, QCoreApplication, QIODevice, QObject, QThread, Qt, pyqtSignal
+from PyQt6.QtGui import QGuiApplication, QImage, QImageReader, QPixmap
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Set
+import sqlite3
+
+from workers.art_cache import ArtIndex, PixmapCache, ThumbnailStore, art_hash
+from workers.metadata_worker import extract_album_art
+
+# Long edges the widgets draw covers at: AlbumArtWidget's art, MiniPlayer
+ART_SIZES = (180, 220)
+
+
+def decode_art(data: bytes, edges: Sequence[int]) -> Dict[int, QImage]:
+    """Decode encoded cover bytes to one QImage per long edge in ``edges``.
+
+    QImageReader.setScaledSize lets the JPEG decoder skip straight to a
+    reduced scale, so a 4000 px cover never exists at full size in memory.
+    The file is decoded once, at the largest edge, and the smaller edges are
+    scaled down from that. Covers already smaller than an edge keep their
+    own size. Safe to call from any thread.
+    """
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    size = reader.size()
+    largest = max(edges)
+    if size.isValid() and max(size.width(), size.height()) > largest:
+        reader.setScaledSize(size.scaled(largest, largest, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(reader.errorString())
+
+    images: Dict[int, QImage] = {}
+    for edge in edges:
+        if max(image.width(), image.height()) > edge:
+            images[edge] = image.scaled(edge, edge, Qt.AspectRatioMode.KeepAspectRatio,
+                                        Qt.TransformationMode.SmoothTransformation)
+        else:
+            images[edge] = image
+    return images
+
+
+class AlbumArtWorker(QObject):
+    # filepath, art hash ("" without a cover, None on failure), {edge: QImage}; images None if skipped
+    art_ready = pyqtSignal(str, object, object)
+    error_occurred = pyqtSignal(str, str)
+
+    def __init__(self, loader: "AlbumArtLoader"):
+        super().__init__()
+        self.loader = loader
+
+    def load(self, filepath: str, edges: tuple):
+        # Skip jobs for tracks that stopped being current or next-up while queued
+        if filepath not in self.loader.wanted:
+            self.art_ready.emit(filepath, None, None)
+            return
+        try:
+            art, images = self._load(filepath, edges)
+        except Exception as e:
+            self.error_occurred.emit(filepath, str(e))
+            art, images = None, {}
+        self.art_ready.emit(filepath, art, images)
+
+    def _load(self, filepath: str, edges: tuple):
+        index, thumbnails = self.loader.index, self.loader.thumbnails
+        # A known track needs neither tag parsing nor decoding
+        art = index.get(filepath) if index is not None else None
+        if art == "":
+            return art, {}
+        if art and thumbnails is not None:
+            images = thumbnails.load(art, edges)
+            if images is not None:
+                return art, images
+
+        data = extract_album_art(filepath)
+        if not data:
+            art, images = "", {}
+        else:
+            art = art_hash(data)
+            # Another track of the same album may have stored this cover already
+            images = thumbnails.load(art, edges) if thumbnails is not None else None
+            if images is None:
+                images = decode_art(data, edges)
+                if thumbnails is not None:
+                    thumbnails.save(art, images)
+        if index is not None:
+            index.put(filepath, art)
+        return art, images
+
+
+class AlbumArtLoader(QObject):
+    """Extracts and decodes album art on a worker thread at display sizes.
+
+    request() asks for the current track's cover, and art_ready fires once
+    pixmap() can serve it, straight away on a cache hit. prefetch() loads
+    the next tracks in play order ahead of time. The worker only produces
+    QImages, which are converted to QPixmaps on the GUI thread.
+
+    Covers are cached by the hash of their raw bytes, so every track of an
+    album shares one entry. There are two tiers: an in-memory LRU of scaled
+    pixmaps bounded by ``max_bytes``, and PNG thumbnails on disk with a
+    ``path -> hash`` index next to the metadata cache. A track seen before
+    is served from thumbnails without parsing tags or decoding its JPEG.
+    """
+
+    art_ready = pyqtSignal(str)
+    _load = pyqtSignal(str, tuple)
+
+    def __init__(self, parent=None, sizes: Sequence[int] = ART_SIZES, max_bytes: int = 32 * 1024 * 1024,
+                 index: ArtIndex | None = None, thumbnails: ThumbnailStore | None = None):
+        super().__init__(parent)
+        app = QCoreApplication.instance()
+        # Decode at device pixels so HiDPI screens stay sharp
+        dpr = app.devicePixelRatio() if isinstance(app, QGuiApplication) else 1.0
+        self.edges = tuple(sorted({round(edge * dpr) for edge in sizes}))
+        self.dpr = dpr
+        self.index = index if index is not None else self._open_default_index()
+        self.thumbnails = thumbnails if thumbnails is not None else self._open_default_thumbnails()
+        self.current: str | None = None
+        # Read by the worker to drop stale jobs; replaced, never mutated in place
+        self.wanted: Set[str] = set()
+        self._pixmaps = PixmapCache(max_bytes)
+        # path -> art hash for tracks resolved this session
+        self._hashes: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Set[str] = set()
+        self._next_up: List[str] = []
+
+        self._thread = QThread()
+        self._worker = AlbumArtWorker(self)
+        self._worker.moveToThread(self._thread)
+        self._load.connect(self._worker.load)
+        self._worker.art_ready.connect(self._on_art_ready)
+        self._worker.error_occurred.connect(self._on_error)
+        self._thread.start()
+        if app is not None:
+            app.aboutToQuit.connect(self.cleanup)
+
+    @staticmethod
+    def _open_default_index() -> ArtIndex | None:
+        # A broken or locked database must never stop art loading
+        try:
+            return ArtIndex()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Art index unavailable: {e}")
+            return None
+
+    @staticmethod
+    def _open_default_thumbnails() -> ThumbnailStore | None:
+        try:
+            return ThumbnailStore()
+        except OSError as e:
+            print(f"Thumbnail store unavailable: {e}")
+            return None
+
+    def request(self, filepath: str):
+        """Load the cover for the track now playing."""
+        self.current = filepath
+        self._update_wanted()
+        if self._cached(filepath):
+            self._hashes.move_to_end(filepath)
+            self.art_ready.emit(filepath)
+            return
+        self._queue(filepath)
+
+    def prefetch(self, filepaths: Iterable[str]):
+        """Load covers for the upcoming tracks, next-up first."""
+        self._next_up = [f for f in filepaths if f]
+        self._update_wanted()
+        for filepath in self._next_up:
+            if not self._cached(filepath):
+                self._queue(filepath)
+
+    def pixmap(self, filepath: str, size: int) -> QPixmap | None:
+        """The cover for ``filepath`` at logical ``size``; None without one."""
+        art = self._hashes.get(filepath)
+        if not art:
+            return None
+        wanted = round(size * self.dpr)
+        # Smallest stored edge that covers the request, else the largest
+        edge = min(self.edges, key=lambda e: (e < wanted, abs(e - wanted)))
+        return self._pixmaps.get((art, edge))
+
+    def _cached(self, filepath: str) -> bool:
+        art = self._hashes.get(filepath)
+        if art is None:
+            return False
+        return art == "" or all((art, edge) in self._pixmaps for edge in self.edges)
+
+    def _update_wanted(self):
+        wanted = set(self._next_up)
+        if self.current:
+            wanted.add(self.current)
+        self.wanted = wanted
+
+    def _queue(self, filepath: str):
+        if filepath in self._pending:
+            return
+        self._pending.add(filepath)
+        self._load.emit(filepath, self.edges)
+
+    def _on_art_ready(self, filepath: str, art: str | None, images: Dict[int, QImage] | None):
+        self._pending.discard(filepath)
+        if images is None:
+            return
+        if art is None:
+            self._hashes.pop(filepath, None)
+        else:
+            self._hashes[filepath] = art
+            self._hashes.move_to_end(filepath)
+            while len(self._hashes) > 4096:
+                self._hashes.popitem(last=False)
+            for edge, image in images.items():
+                pixmap = QPixmap.fromImage(image)
+                pixmap.setDevicePixelRatio(self.dpr)
+                self._pixmaps.put((art, edge), pixmap)
+        if filepath == self.current:
+            self.art_ready.emit(filepath)
+
+    def _on_error(self, filepath: str, message: str):
+        print(f"Album art failed for {filepath}: {message}")
+
+    def cleanup(self):
+        # Safe to call multiple times
+        self.wanted = set()
+        try:
+            self._thread.quit()
+            self._thread.wait(3000)
+        except RuntimeError:
+            pass
+        self._pixmaps.clear()
+        self._hashes.clear()
+        self._pending.clear()
+        if self.index is not None:
+            self.index.close()
+            self.index = None
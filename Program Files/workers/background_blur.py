@@ -0,0 +1,164 @@
+from PyQt6.QtCore import QCoreApplication, QObject, QThread, QEvent, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import QLabel
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Sequence
+import io
+
+from PIL import Image, ImageFilter
+
+# Long-edge sizes of the cached levels; labels scale down from the next size up
+DEFAULT_LEVELS = (320, 640, 1280)
+
+
+def _to_pil(source) -> Image.Image:
+    if isinstance(source, QImage):
+        image = source.convertToFormat(QImage.Format.Format_RGB888)
+        ptr = image.constBits()
+        ptr.setsize(image.sizeInBytes())
+        return Image.frombuffer("RGB", (image.width(), image.height()), bytes(ptr), "raw", "RGB",
+                                image.bytesPerLine(), 1)
+    return Image.open(io.BytesIO(source))
+
+
+def build_blur_pyramid(source, levels: Sequence[int] = DEFAULT_LEVELS, base_size: int = 96,
+                       radius: float = 6.0) -> List[QImage]:
+    """Blur ``source`` (encoded image bytes or a QImage) into one QImage per level.
+
+    The blur runs on a ``base_size`` thumbnail, where it costs microseconds,
+    and the result is then upscaled to each level. A heavy background blur
+    has no detail left to lose, so this looks the same as blurring at full
+    size. Safe to call from any thread.
+    """
+    image = _to_pil(source)
+    # JPEG decoders can skip straight to a reduced scale
+    image.draft("RGB", (base_size * 2, base_size * 2))
+    image = image.convert("RGB")
+    image.thumbnail((base_size, base_size), Image.Resampling.BILINEAR)
+    blurred = image.filter(ImageFilter.GaussianBlur(radius))
+    pyramid = []
+    w, h = blurred.size
+    for edge in levels:
+        scale = edge / max(w, h)
+        level = blurred.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.Resampling.BILINEAR)
+        data = level.tobytes()
+        pyramid.append(QImage(data, level.width, level.height, level.width * 3,
+                              QImage.Format.Format_RGB888).copy())
+    return pyramid
+
+
+class BackgroundBlurWorker(QObject):
+    pyramid_ready = pyqtSignal(object, list)  # key, [QImage per level]
+    error_occurred = pyqtSignal(object, str)
+
+    def __init__(self, manager: "BackgroundBlurManager"):
+        super().__init__()
+        self.manager = manager
+
+    def build(self, key, source):
+        # Skip jobs overtaken by a newer track while they sat in the queue
+        if key != self.manager.latest_key:
+            return
+        try:
+            pyramid = build_blur_pyramid(source, self.manager.levels, self.manager.base_size,
+                                         self.manager.radius)
+        except Exception as e:
+            self.error_occurred.emit(key, str(e))
+            return
+        self.pyramid_ready.emit(key, pyramid)
+
+
+class BackgroundBlurManager(QObject):
+    """Builds blurred window backgrounds off the GUI thread and serves them per size.
+
+    request() queues a track's art for the worker. Its pyramid is kept in a
+    small LRU, and background_ready fires when it can be shown. show_on()
+    puts it on a label at the label's size, picked from the nearest larger
+    level. Labels passed to attach() follow their own resizes by rescaling a
+    cached level, never by blurring again. With label-sized pixmaps, a
+    crossfade between the two background labels is pure compositing.
+    """
+
+    background_ready = pyqtSignal(object)
+    _build = pyqtSignal(object, object)
+
+    def __init__(self, parent=None, levels: Sequence[int] = DEFAULT_LEVELS, base_size: int = 96,
+                 radius: float = 6.0, max_tracks: int = 8):
+        super().__init__(parent)
+        self.levels = tuple(sorted(levels))
+        self.base_size = base_size
+        self.radius = radius
+        self.max_tracks = max_tracks
+        self.latest_key = None
+        self._pyramids: "OrderedDict[Hashable, List[QImage]]" = OrderedDict()
+        self._label_keys: Dict[QLabel, Hashable] = {}
+
+        self._thread = QThread()
+        self._worker = BackgroundBlurWorker(self)
+        self._worker.moveToThread(self._thread)
+        self._build.connect(self._worker.build)
+        self._worker.pyramid_ready.connect(self._on_pyramid_ready)
+        self._worker.error_occurred.connect(self._on_error)
+        self._thread.start()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.cleanup)
+
+    def request(self, key, source):
+        """Build the background for ``key`` from art bytes or a QImage, unless cached."""
+        self.latest_key = key
+        if key in self._pyramids:
+            self._pyramids.move_to_end(key)
+            self.background_ready.emit(key)
+            return
+        self._build.emit(key, source)
+
+    def has(self, key) -> bool:
+        return key in self._pyramids
+
+    def attach(self, label: QLabel):
+        """Keep ``label``'s background at its own size across resizes."""
+        label.installEventFilter(self)
+
+    def show_on(self, label: QLabel, key) -> bool:
+        """Show the cached background for ``key`` on ``label``; False if not built yet."""
+        pixmap = self.pixmap_for(key, label.size())
+        if pixmap is None:
+            return False
+        self._label_keys[label] = key
+        label.setPixmap(pixmap)
+        return True
+
+    def pixmap_for(self, key, size: QSize) -> QPixmap | None:
+        pyramid = self._pyramids.get(key)
+        if pyramid is None or size.isEmpty():
+            return None
+        edge = max(size.width(), size.height())
+        level = next((img for img in pyramid if max(img.width(), img.height()) >= edge), pyramid[-1])
+        return QPixmap.fromImage(level.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                              Qt.TransformationMode.SmoothTransformation))
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Resize and obj in self._label_keys:
+            self.show_on(obj, self._label_keys[obj])
+        return False
+
+    def _on_pyramid_ready(self, key, pyramid: List[QImage]):
+        self._pyramids[key] = pyramid
+        self._pyramids.move_to_end(key)
+        while len(self._pyramids) > self.max_tracks:
+            self._pyramids.popitem(last=False)
+        self.background_ready.emit(key)
+
+    def _on_error(self, key, message: str):
+        print(f"Background blur failed for {key}: {message}")
+
+    def cleanup(self):
+        # Safe to call multiple times
+        try:
+            self._thread.quit()
+            self._thread.wait(3000)
+        except RuntimeError:
+            pass
+        self._pyramids.clear()
+        self._label_keys.clear()
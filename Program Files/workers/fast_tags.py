@@ -0,0 +1,296 @@
+"""Tag readers that seek past embedded artwork instead of loading it.
+
+mutagen reads every FLAC metadata block, every MP4 ``ilst`` item and the
+whole Ogg comment packet into memory, covers included, even when only the
+title is wanted. These readers
+walk the container headers and read just the blocks holding the fields the
+playlist shows, so a file with a large cover costs a few small reads.
+
+Each reader returns a metadata dict like MetadataWorker._extract_metadata,
+or None when the file does not look like its format; the caller then falls
+back to mutagen. I/O errors propagate.
+"""
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+import os
+import struct
+
+# Vorbis comment / MP4 item -> metadata key
+_VORBIS_FIELDS = {"TITLE": "title", "ARTIST": "artist", "ALBUM": "album"}
+_MP4_FIELDS = {b"\xa9nam": "title", b"\xa9ART": "artist", b"\xa9alb": "album"}
+
+_FLAC_STREAMINFO = 0
+_FLAC_VORBIS_COMMENT = 4
+
+
+def _empty() -> Dict[str, Any]:
+    return {"title": "", "artist": "", "album": "", "duration": 0}
+
+
+def _skip_id3(f: BinaryIO) -> bytes:
+    """Skip a leading ID3v2 tag (some FLAC encoders add one); returns the next 4 bytes."""
+    head = f.read(4)
+    if head[:3] != b"ID3":
+        return head
+    rest = f.read(6)
+    if len(rest) < 6:
+        return b""
+    size = 0
+    for byte in rest[2:6]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if rest[1] & 0x10 else 0
+    f.seek(10 + size + footer)
+    return f.read(4)
+
+
+def _read_exact(read, n: int) -> bytes:
+    data = read(n)
+    if len(data) < n:
+        raise EOFError
+    return data
+
+
+def _vorbis_comments(read, skip, md: Dict[str, Any]) -> None:
+    """Fill title/artist/album from a Vorbis comment list; first value wins.
+
+    ``read(n)`` and ``skip(n)`` walk the comment bytes. Only the start of each
+    entry is read, so a base64 cover in METADATA_BLOCK_PICTURE is skipped.
+    """
+    (vendor,) = struct.unpack("<I", _read_exact(read, 4))
+    skip(vendor)
+    (count,) = struct.unpack("<I", _read_exact(read, 4))
+    for _ in range(count):
+        (length,) = struct.unpack("<I", _read_exact(read, 4))
+        head = _read_exact(read, min(length, 16))
+        key, sep, value = head.partition(b"=")
+        field = _VORBIS_FIELDS.get(key.decode("ascii", "replace").upper()) if sep else None
+        rest = length - len(head)
+        if field and not md[field]:
+            md[field] = (value + _read_exact(read, rest)).decode("utf-8", "replace")
+        else:
+            skip(rest)
+        if all(md[f] for f in _VORBIS_FIELDS.values()):
+            return
+
+
+def read_flac(path: str) -> Optional[Dict[str, Any]]:
+    """Read a FLAC file's tags and length, seeking past PICTURE and other blocks."""
+    with open(path, "rb") as f:
+        if _skip_id3(f) != b"fLaC":
+            return None
+        md = _empty()
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                break
+            kind = header[0] & 0x7F
+            length = int.from_bytes(header[1:4], "big")
+            if kind == _FLAC_STREAMINFO:
+                info = f.read(length)
+                if len(info) >= 18:
+                    bits = int.from_bytes(info[10:18], "big")
+                    rate, samples = bits >> 44, bits & ((1 << 36) - 1)
+                    if rate:
+                        md["duration"] = int(samples / rate)
+            elif kind == _FLAC_VORBIS_COMMENT:
+                block_end = f.tell() + length
+                try:
+                    _vorbis_comments(f.read, lambda n: f.seek(n, os.SEEK_CUR), md)
+                except (EOFError, struct.error):
+                    # Truncated block: keep what was read
+                    pass
+                f.seek(block_end)
+            else:
+                f.seek(length, os.SEEK_CUR)
+            if header[0] & 0x80:
+                break
+        return md
+
+
+class _OggStream:
+    """The page bodies of one logical Ogg stream, read or skipped as one byte stream."""
+
+    def __init__(self, f: BinaryIO, serial: int, offset: int):
+        self.f = f
+        self.serial = serial
+        self._next = offset  # file offset of the next page header
+        self._left = 0  # bytes left in the current page body
+
+    def _next_page(self) -> None:
+        while True:
+            self.f.seek(self._next)
+            header = self.f.read(27)
+            if len(header) < 27 or header[:4] != b"OggS":
+                raise EOFError
+            lacing = self.f.read(header[26])
+            body = self._next + 27 + len(lacing)
+            self._next = body + sum(lacing)
+            if struct.unpack_from("<I", header, 14)[0] == self.serial:
+                self.f.seek(body)
+                self._left = sum(lacing)
+                return
+
+    def read(self, n: int) -> bytes:
+        out = bytearray()
+        while n > 0:
+            if not self._left:
+                self._next_page()
+            chunk = self.f.read(min(n, self._left))
+            if not chunk:
+                raise EOFError
+            self._left -= len(chunk)
+            n -= len(chunk)
+            out += chunk
+        return bytes(out)
+
+    def skip(self, n: int) -> None:
+        while n > 0:
+            if not self._left:
+                self._next_page()
+            step = min(n, self._left)
+            self.f.seek(step, os.SEEK_CUR)
+            self._left -= step
+            n -= step
+
+
+def _ogg_last_position(f: BinaryIO, serial: int, end: int) -> Optional[int]:
+    """Granule position of the stream's last page; pages are at most ~64 KiB."""
+    size = min(end, 65536 + 27 + 255)
+    f.seek(end - size)
+    data = f.read(size)
+    i = data.rfind(b"OggS")
+    while i >= 0:
+        if i + 27 <= len(data) and struct.unpack_from("<I", data, i + 14)[0] == serial:
+            return struct.unpack_from("<q", data, i + 6)[0]
+        i = data.rfind(b"OggS", 0, i)
+    return None
+
+
+def read_ogg(path: str) -> Optional[Dict[str, Any]]:
+    """Read an Ogg Vorbis or Opus file's tags and length, skipping embedded covers."""
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size
+        header = f.read(27)
+        if len(header) < 27 or header[:4] != b"OggS":
+            return None
+        serial = struct.unpack_from("<I", header, 14)[0]
+        lacing = f.read(header[26])
+        # The identification header is alone on the first page
+        ident = f.read(sum(lacing))
+        if ident.startswith(b"\x01vorbis") and len(ident) >= 16:
+            rate, pre_skip, magic = struct.unpack_from("<I", ident, 12)[0], 0, b"\x03vorbis"
+        elif ident.startswith(b"OpusHead") and len(ident) >= 12:
+            rate, pre_skip, magic = 48000, struct.unpack_from("<H", ident, 10)[0], b"OpusTags"
+        else:
+            return None
+        md = _empty()
+        stream = _OggStream(f, serial, 27 + len(lacing) + len(ident))
+        try:
+            if stream.read(len(magic)) != magic:
+                return None
+            _vorbis_comments(stream.read, stream.skip, md)
+        except (EOFError, struct.error):
+            pass
+        position = _ogg_last_position(f, serial, end)
+        if position is not None and rate:
+            md["duration"] = int(max(0, position - pre_skip) / rate)
+        return md
+
+
+def _atoms(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, body start, atom end) for the atoms between ``start`` and ``end``."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header)
+        body = pos + 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            (size,) = struct.unpack(">Q", large)
+            body = pos + 16
+        elif size == 0:
+            size = end - pos
+        if size < body - pos or pos + size > end:
+            return
+        yield kind, body, pos + size
+        pos += size
+
+
+def _find(f: BinaryIO, start: int, end: int, kind: bytes) -> Optional[Tuple[int, int]]:
+    for found, body, stop in _atoms(f, start, end):
+        if found == kind:
+            return body, stop
+    return None
+
+
+def _read(f: BinaryIO, start: int, end: int, limit: int = 64) -> bytes:
+    f.seek(start)
+    return f.read(min(end - start, limit))
+
+
+def _mp4_length(f: BinaryIO, body: int, end: int) -> Optional[int]:
+    """Length in seconds from an mvhd or mdhd body, which share a layout."""
+    data = _read(f, body, end)
+    # Version 1 has 64-bit creation/modification times and duration
+    fields, fmt = (data[20:32], ">IQ") if data[:1] == b"\x01" else (data[12:20], ">II")
+    if len(fields) < struct.calcsize(fmt):
+        return None
+    timescale, duration = struct.unpack(fmt, fields)
+    return int(duration / timescale) if timescale else 0
+
+
+def _mp4_text(f: BinaryIO, start: int, end: int) -> str:
+    data = _find(f, start, end, b"data")
+    if data is None:
+        return ""
+    # Type indicator and locale, then the UTF-8 value
+    value = _read(f, data[0], data[1], limit=4096)[8:]
+    return value.decode("utf-8", "replace")
+
+
+def read_mp4(path: str) -> Optional[Dict[str, Any]]:
+    """Read an MP4/M4A file's tags and length without loading ``covr`` items."""
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size
+        if f.read(8)[4:8] != b"ftyp":
+            return None
+        moov = _find(f, 0, end, b"moov")
+        if moov is None:
+            return None
+        md = _empty()
+        movie_length = None
+        track_length = None
+        for kind, body, stop in _atoms(f, *moov):
+            if kind == b"mvhd":
+                movie_length = _mp4_length(f, body, stop)
+            elif kind == b"trak" and track_length is None:
+                # Like mutagen: the first sound track's mdhd, else the mvhd
+                mdia = _find(f, body, stop, b"mdia")
+                if mdia is None:
+                    continue
+                hdlr = _find(f, *mdia, b"hdlr")
+                mdhd = _find(f, *mdia, b"mdhd")
+                if hdlr and mdhd and _read(f, *hdlr)[8:12] == b"soun":
+                    track_length = _mp4_length(f, *mdhd)
+            elif kind == b"udta":
+                meta = _find(f, body, stop, b"meta")
+                if meta is None:
+                    continue
+                start, meta_end = meta
+                # iTunes writes meta as a full atom; QuickTime files have no version field
+                if _read(f, start, meta_end, 8)[4:8] != b"hdlr":
+                    start += 4
+                ilst = _find(f, start, meta_end, b"ilst")
+                if ilst is None:
+                    continue
+                for item, item_body, item_end in _atoms(f, *ilst):
+                    field = _MP4_FIELDS.get(item)
+                    if field and not md[field]:
+                        md[field] = _mp4_text(f, item_body, item_end)
+        length = track_length if track_length is not None else movie_length
+        md["duration"] = length or 0
+        return md
@@ -0,0 +1,167 @@
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from typing import Iterable, Iterator, List, Set, Tuple
+import fnmatch
+import os
+import time
+
+from utils import is_audio_file
+
+# Folder/file names skipped by default (hidden entries, NAS thumbnail dirs, ...)
+DEFAULT_IGNORE_PATTERNS = (".*", "@eaDir", "$RECYCLE.BIN", "System Volume Information")
+
+
+def walk_library(root: str, ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+                 follow_symlinks: bool = True, should_stop=lambda: False
+                 ) -> Iterator[Tuple[str, List[str], List[os.DirEntry]]]:
+    """Yield (folder, subfolders, audio entries) for each folder under ``root``.
+
+    Walks depth-first with ``os.scandir`` without building the full listing.
+    Directories are tracked by (st_dev, st_ino), so symlink loops and
+    bind-mounted duplicates are visited only once.
+    """
+    patterns = tuple(ignore_patterns)
+    visited: Set[Tuple[int, int]] = set()
+    stack = [root]
+    while stack and not should_stop():
+        folder = stack.pop()
+        try:
+            st = os.stat(folder)
+        except OSError:
+            continue
+        key = (st.st_dev, st.st_ino)
+        if key in visited:
+            continue
+        visited.add(key)
+
+        subdirs, audio = list_directory(folder, patterns, follow_symlinks)
+        yield folder, subdirs, audio
+        # Reverse so folders are visited in listing order
+        stack.extend(reversed(sorted(subdirs)))
+
+
+def list_directory(folder: str, ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+                   follow_symlinks: bool = True) -> Tuple[List[str], List[os.DirEntry]]:
+    """Return (subfolder paths, audio file entries) for one folder."""
+    subdirs: List[str] = []
+    audio: List[os.DirEntry] = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if any(fnmatch.fnmatch(entry.name, p) for p in ignore_patterns):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        subdirs.append(entry.path)
+                    elif is_audio_file(entry.name) and entry.is_file(follow_symlinks=follow_symlinks):
+                        audio.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return subdirs, audio
+
+
+class LibraryScanner(QObject):
+    files_found = pyqtSignal(list)   # chunk of audio file paths
+    finished = pyqtSignal(int)       # total files found
+
+    def __init__(self, root: str, ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+                 first_chunk: int = 50, chunk_size: int = 1000, chunk_interval_ms: int = 250):
+        super().__init__()
+        self.root = root
+        self.ignore_patterns = tuple(ignore_patterns)
+        # A small first chunk gets something playable on screen right away;
+        # later chunks are larger to keep the GUI event count low
+        self.first_chunk = first_chunk
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval_ms / 1000.0
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def process(self):
+        chunk: List[str] = []
+        limit = self.first_chunk
+        total = 0
+        last_flush = time.monotonic()
+        for _, _, audio in walk_library(self.root, self.ignore_patterns, should_stop=lambda: self._cancelled):
+            if self._cancelled:
+                break
+            for entry in audio:
+                chunk.append(entry.path)
+                if len(chunk) >= limit:
+                    total += len(chunk)
+                    self.files_found.emit(chunk)
+                    chunk = []
+                    limit = self.chunk_size
+                    last_flush = time.monotonic()
+            # Checked per folder too, so a long run of folders without audio
+            # cannot hold back files already found
+            now = time.monotonic()
+            if chunk and now - last_flush >= self.chunk_interval:
+                total += len(chunk)
+                self.files_found.emit(chunk)
+                chunk = []
+                limit = self.chunk_size
+                last_flush = now
+        if chunk and not self._cancelled:
+            total += len(chunk)
+            self.files_found.emit(chunk)
+        self.finished.emit(total)
+
+
+class LibraryScanManager:
+    """Scans folders in the background and streams results to the player.
+
+    Each chunk is handed to ``metadata_manager.add_files`` (if given) and to
+    the parent's ``on_library_files_found`` slot as soon as it is found.
+    """
+
+    def __init__(self, parent=None, metadata_manager=None):
+        self.parent = parent
+        self.metadata_manager = metadata_manager
+        self.scans: List[Tuple[QThread, LibraryScanner]] = []
+
+    def scan_folder(self, root: str):
+        thread = QThread()
+        scanner = LibraryScanner(root)
+        scanner.moveToThread(thread)
+
+        thread.started.connect(scanner.process)
+
+        scanner.finished.connect(thread.quit)
+        scanner.finished.connect(scanner.deleteLater)
+        thread.finished.connect(lambda t=thread: self._on_thread_finished(t))
+
+        scanner.files_found.connect(self._on_files_found)
+        if self.parent and hasattr(self.parent, "on_library_scan_finished"):
+            scanner.finished.connect(self.parent.on_library_scan_finished)
+
+        self.scans.append((thread, scanner))
+        thread.start()
+
+    def _on_files_found(self, files: List[str]):
+        # Runs in the GUI thread
+        if self.parent and hasattr(self.parent, "on_library_files_found"):
+            self.parent.on_library_files_found(files)
+        if self.metadata_manager is not None:
+            self.metadata_manager.add_files(files)
+
+    def _on_thread_finished(self, thread: QThread):
+        try:
+            thread.deleteLater()
+        except RuntimeError:
+            pass
+        self.scans = [(t, s) for t, s in self.scans if t is not thread]
+
+    def cleanup(self):
+        # Graceful shutdown; safe to call multiple times
+        for thread, scanner in self.scans:
+            try:
+                scanner.cancel()
+                thread.quit()
+                thread.wait(3000)
+            except RuntimeError:
+                pass
+        self.scans = []
@@ -0,0 +1,262 @@
+from PyQt6.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, pyqtSignal
+from typing import Dict, Iterable, List, Set, Tuple
+import os
+
+from workers.library_scanner import DEFAULT_IGNORE_PATTERNS, list_directory, walk_library
+
+# folder -> {audio path: (size, mtime_ns)}
+Snapshot = Dict[str, Dict[str, Tuple[int, int]]]
+
+
+def _stat_entries(entries: Iterable[os.DirEntry]) -> Dict[str, Tuple[int, int]]:
+    stats = {}
+    for entry in entries:
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        stats[entry.path] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+def _dir_key(folder: str) -> Tuple[int, int] | None:
+    try:
+        st = os.stat(folder)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+class _LibraryIndex(QObject):
+    """Owns the folder snapshot; every listing and stat runs on its thread.
+
+    The GUI thread only forwards folder names and applies the deltas it gets
+    back, so a slow disk or network share never stalls the UI.
+    """
+
+    # folders to start watching
+    folders_added = pyqtSignal(list)
+    # added, removed, changed files; folders to stop watching
+    delta_ready = pyqtSignal(list, list, list, list)
+
+    def __init__(self, ignore_patterns: Tuple[str, ...], rescan_ms: int, tick_ms: int):
+        super().__init__()
+        self.ignore_patterns = ignore_patterns
+        self.rescan_ms = rescan_ms
+        self.tick_ms = tick_ms
+        self._snapshot: Snapshot = {}
+        # Folder identities, used to skip folders reachable under two paths
+        self._folder_keys: Dict[str, Tuple[int, int]] = {}
+        self._dir_keys: Set[Tuple[int, int]] = set()
+        # Folders left in the current sweep; refilled from the snapshot when empty
+        self._sweep_queue: List[str] = []
+
+    def build(self, root: str):
+        """Snapshot ``root``; no files are reported, they are already known."""
+        self._add_folder(root)
+
+    def diff(self, folders: List[str]):
+        """Re-list ``folders`` and report what changed since the last snapshot."""
+        added: List[str] = []
+        removed: List[str] = []
+        changed: List[str] = []
+        gone_folders: List[str] = []
+
+        for folder in folders:
+            if folder not in self._snapshot:
+                continue
+            if not os.path.isdir(folder):
+                files, gone = self._drop_folder(folder)
+                removed.extend(files)
+                gone_folders.extend(gone)
+                continue
+
+            subdirs, audio = list_directory(folder, self.ignore_patterns)
+            old = self._snapshot[folder]
+            new = _stat_entries(audio)
+            self._snapshot[folder] = new
+
+            added.extend(p for p in new if p not in old)
+            removed.extend(p for p in old if p not in new)
+            changed.extend(p for p, st in new.items() if p in old and old[p] != st)
+
+            # New sub-folders; deleted or moved ones report their own change
+            for subdir in subdirs:
+                if subdir not in self._snapshot:
+                    added.extend(self._add_folder(subdir))
+
+        if added or removed or changed or gone_folders:
+            self.delta_ready.emit(added, removed, changed, gone_folders)
+
+    def sweep_step(self):
+        """Re-list the next slice of folders, covering the library once per rescan_ms."""
+        if not self._sweep_queue:
+            self._sweep_queue = list(self._snapshot)
+            if not self._sweep_queue:
+                return
+        batch = -(-len(self._snapshot) * self.tick_ms // self.rescan_ms)
+        batch = min(max(1, batch), len(self._sweep_queue))
+        folders = self._sweep_queue[-batch:]
+        del self._sweep_queue[-batch:]
+        self.diff(folders)
+
+    def _add_folder(self, root: str) -> List[str]:
+        found: List[str] = []
+        new_paths = []
+        for folder, _, audio in walk_library(root, self.ignore_patterns):
+            key = _dir_key(folder)
+            # Skip folders already watched under another path (symlink loops)
+            if key is None or key in self._dir_keys:
+                continue
+            self._dir_keys.add(key)
+            self._folder_keys[folder] = key
+            self._snapshot[folder] = _stat_entries(audio)
+            found.extend(self._snapshot[folder])
+            new_paths.append(folder)
+        if new_paths:
+            self.folders_added.emit(new_paths)
+        return found
+
+    def _drop_folder(self, root: str) -> Tuple[List[str], List[str]]:
+        prefix = root.rstrip(os.sep) + os.sep
+        gone = [f for f in self._snapshot if f == root or f.startswith(prefix)]
+        files: List[str] = []
+        for folder in gone:
+            files.extend(self._snapshot.pop(folder))
+            key = self._folder_keys.pop(folder, None)
+            if key is not None:
+                self._dir_keys.discard(key)
+        return files, gone
+
+
+class LibraryWatcher(QObject):
+    """Keeps a watched library root in sync through filesystem notifications.
+
+    Every folder is registered with QFileSystemWatcher (inotify on Linux,
+    ReadDirectoryChangesW on Windows, polling where neither exists). When a
+    folder changes, only that folder is re-listed and diffed against the last
+    snapshot, so the cost follows the size of the change, not the library.
+    Listing, stat calls and walks of new sub-trees run on a worker thread;
+    only the resulting deltas come back to the GUI thread.
+
+    Directory watches do not fire when a file is rewritten in place, as most
+    taggers do. Passing ``rescan_ms`` > 0 turns on a background sweep that
+    re-lists a few folders per tick on the worker, covering the whole
+    library once per period, so such retags show up in files_changed.
+    """
+
+    files_added = pyqtSignal(list)
+    files_removed = pyqtSignal(list)
+    files_changed = pyqtSignal(list)  # size or mtime differs, e.g. retagged
+
+    _build = pyqtSignal(str)
+    _diff = pyqtSignal(list)
+    _sweep_tick = pyqtSignal()
+
+    def __init__(self, parent=None, metadata_manager=None,
+                 ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS, debounce_ms: int = 500,
+                 rescan_ms: int = 0, sweep_tick_ms: int = 1000):
+        super().__init__()
+        self.parent = parent
+        self.metadata_manager = metadata_manager
+        self.ignore_patterns = tuple(ignore_patterns)
+        self._dirty: Set[str] = set()
+        self._thread: QThread | None = None
+
+        self._index = _LibraryIndex(self.ignore_patterns, rescan_ms, sweep_tick_ms)
+        self._index.folders_added.connect(self._on_folders_added)
+        self._index.delta_ready.connect(self._on_delta)
+        self._build.connect(self._index.build)
+        self._diff.connect(self._index.diff)
+        self._sweep_tick.connect(self._index.sweep_step)
+
+        self._watcher = QFileSystemWatcher()
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        # Editors and taggers touch a folder several times per save
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._process_dirty)
+
+        self._sweep = QTimer(self)
+        self._sweep.setInterval(sweep_tick_ms)
+        self._sweep.timeout.connect(self._sweep_tick)
+        self.rescan_ms = rescan_ms
+
+        if parent is not None:
+            if hasattr(parent, "on_library_files_found"):
+                self.files_added.connect(parent.on_library_files_found)
+            if hasattr(parent, "on_library_files_removed"):
+                self.files_removed.connect(parent.on_library_files_removed)
+
+    def watch(self, root: str):
+        """Snapshot ``root`` in the background, then start watching it."""
+        if self._thread is None:
+            self._thread = QThread()
+            self._index.moveToThread(self._thread)
+            self._thread.start()
+        # Diffs queue behind the build on the worker, so none runs on a partial snapshot
+        self._build.emit(root)
+        if self.rescan_ms > 0 and not self._sweep.isActive():
+            self._sweep.start()
+
+    def _on_folders_added(self, folders: List[str]):
+        self._watcher.addPaths(folders)
+
+    def _on_directory_changed(self, folder: str):
+        self._dirty.add(folder)
+        self._debounce.start()
+
+    def _process_dirty(self):
+        dirty, self._dirty = self._dirty, set()
+        if dirty:
+            self._diff.emit(sorted(dirty))
+
+    def _on_delta(self, added: List[str], removed: List[str], changed: List[str], gone_folders: List[str]):
+        watched = set(self._watcher.directories())
+        stale = [f for f in gone_folders if f in watched]
+        if stale:
+            self._watcher.removePaths(stale)
+        if removed:
+            self._on_removed(removed)
+        if added:
+            self._on_added(added)
+        if changed:
+            self._on_changed(changed)
+
+    def _on_added(self, files: List[str]):
+        self.files_added.emit(files)
+        if self.metadata_manager is not None:
+            self.metadata_manager.add_files(files)
+
+    def _on_removed(self, files: List[str]):
+        if self.metadata_manager is not None:
+            for filepath in files:
+                self.metadata_manager.cancel_file(filepath)
+                if self.metadata_manager.cache is not None:
+                    self.metadata_manager.cache.evict(filepath)
+        self.files_removed.emit(files)
+
+    def _on_changed(self, files: List[str]):
+        if self.metadata_manager is not None:
+            if self.metadata_manager.cache is not None:
+                for filepath in files:
+                    self.metadata_manager.cache.evict(filepath)
+            self.metadata_manager.add_files(files)
+        self.files_changed.emit(files)
+
+    def cleanup(self):
+        # Safe to call multiple times
+        self._debounce.stop()
+        self._sweep.stop()
+        paths = self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        try:
+            if self._thread:
+                self._thread.quit()
+                self._thread.wait(3000)
+        except RuntimeError:
+            pass
+        self._thread = None
@@ -0,0 +1,137 @@
+from PyQt6.QtCore import QStandardPaths
+from typing import Dict, Any, Optional, Set, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+
+def default_cache_path() -> str:
+    """Return the metadata cache location inside the user data directory."""
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericDataLocation)
+    if not base:
+        base = os.path.expanduser("~")
+    folder = os.path.join(base, "SASMusicPlayer")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, "metadata_cache.sqlite3")
+
+
+class MetadataCache:
+    """Persistent tag cache keyed by (path, size, mtime_ns).
+
+    All rows are loaded into memory on open so a lookup costs one ``os.stat``
+    plus a dict hit; writes go through to SQLite in batches. Stale rows are
+    dropped from memory at once and deleted from SQLite with the next batch,
+    so a lookup never waits on a commit. A row is only dropped when its file
+    changed or the watcher evicts it, never because the file is unreachable,
+    so a library on an unmounted drive or offline share keeps its rows. Safe
+    to share between the GUI thread and metadata worker threads.
+    """
+
+    COMMIT_EVERY = 256
+    TABLE = "metadata"
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_cache_path()
+        self._lock = threading.Lock()
+        self._pending = 0
+        # Paths dropped from memory whose rows are deleted on the next commit
+        self._deleted: Set[str] = set()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, data TEXT)"
+        )
+        self._conn.commit()
+        self._rows: Dict[str, Tuple[int, int, str]] = {
+            path: (size, mtime_ns, data)
+            for path, size, mtime_ns, data in self._conn.execute(
+                f"SELECT path, size, mtime_ns, data FROM {self.TABLE}"
+            )
+        }
+
+    @staticmethod
+    def _stat_key(filepath: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def get(self, filepath: str) -> Optional[Dict[str, Any]]:
+        """Return cached metadata if the file is unchanged, evicting stale rows."""
+        with self._lock:
+            row = self._rows.get(filepath)
+        if row is None:
+            return None
+        key = self._stat_key(filepath)
+        if key is None:
+            # Missing or unreachable; keep the row in case the share comes back
+            return None
+        if key != row[:2]:
+            self.evict(filepath)
+            return None
+        try:
+            return self._decode(row[2])
+        except ValueError:
+            self.evict(filepath)
+            return None
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        return json.dumps(value)
+
+    @staticmethod
+    def _decode(data: str) -> Any:
+        return json.loads(data)
+
+    def put(self, filepath: str, metadata: Dict[str, Any]) -> None:
+        """Store metadata for the file as it currently exists on disk."""
+        key = self._stat_key(filepath)
+        if key is None:
+            return
+        data = self._encode(metadata)
+        with self._lock:
+            self._rows[filepath] = (key[0], key[1], data)
+            # INSERT OR REPLACE overwrites the row anyway
+            self._deleted.discard(filepath)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} (path, size, mtime_ns, data) VALUES (?, ?, ?, ?)",
+                (filepath, key[0], key[1], data),
+            )
+            # Commit in batches; a commit per file dominates cold imports
+            self._pending += 1
+            if self._pending >= self.COMMIT_EVERY:
+                self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        if self._deleted:
+            self._conn.executemany(f"DELETE FROM {self.TABLE} WHERE path = ?", [(p,) for p in self._deleted])
+            self._deleted.clear()
+        self._conn.commit()
+        self._pending = 0
+
+    def flush(self) -> None:
+        """Commit any buffered writes."""
+        with self._lock:
+            if self._pending:
+                self._commit_locked()
+
+    def evict(self, filepath: str) -> None:
+        """Drop the cached entry for a file; the row is deleted with the next batch."""
+        with self._lock:
+            if self._rows.pop(filepath, None) is None:
+                return
+            self._deleted.add(filepath)
+            self._pending += 1
+            if self._pending >= self.COMMIT_EVERY:
+                self._commit_locked()
+
+    def close(self) -> None:
+        """Close the underlying database; safe to call multiple times."""
+        with self._lock:
+            try:
+                self._commit_locked()
+                self._conn.close()
+            except sqlite3.Error:
+                pass
@@ -1,55 +1,281 @@
-from PyQt6.QtCore import QObject, QThread, pyqtSignal, QMutex, QMutexLocker
-from typing import Dict, Any, List
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal, QMutex, QMutexLocker
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Set, Tuple
+import base64
 import os
+import sqlite3
+import time
 import mutagen
+from mutagen import id3
+from mutagen.flac import Picture
+from mutagen.mp3 import MP3
+
+from workers.fast_tags import read_flac, read_mp4, read_ogg
+from workers.metadata_cache import MetadataCache
+
+
+# Queue priorities, most urgent first
+PRIORITY_NOW_PLAYING = 0
+PRIORITY_VISIBLE = 1
+PRIORITY_NEXT_UP = 2
+PRIORITY_BACKGROUND = 3
+
+# ID3 frames decoded in fast mode; everything else (APIC, lyrics, ...) is kept
+# as undecoded raw bytes by mutagen. ID3v2.2 tags (older iTunes rips) use
+# three-letter IDs, which mutagen upgrades to the v2.4 ones once decoded.
+_FAST_ID3_FRAMES = {
+    "TIT2": id3.TIT2, "TPE1": id3.TPE1, "TALB": id3.TALB,
+    "TT2": id3.TT2, "TP1": id3.TP1, "TAL": id3.TAL,
+}
+
+# Fast-mode readers that seek past embedded pictures; others go through mutagen
+_FAST_READERS = {
+    ".flac": read_flac, ".m4a": read_mp4, ".m4b": read_mp4, ".mp4": read_mp4,
+    ".ogg": read_ogg, ".oga": read_ogg, ".opus": read_ogg,
+}
+
+
+def extract_album_art(filepath: str) -> bytes | None:
+    """Return the raw bytes of the first embedded cover, or None.
+
+    This is the on-demand artwork path; bulk metadata extraction never
+    decodes pictures.
+    """
+    audio = mutagen.File(filepath)
+    if audio is None:
+        return None
+
+    pictures = getattr(audio, "pictures", None)  # FLAC
+    if pictures:
+        return pictures[0].data
+
+    tags = audio.tags
+    if not tags:
+        return None
+
+    if isinstance(tags, id3.ID3):
+        apic = tags.getall("APIC")
+        return apic[0].data if apic else None
+
+    covr = tags.get("covr")  # MP4/M4A
+    if covr:
+        return bytes(covr[0])
+
+    blocks = tags.get("metadata_block_picture")  # Ogg Vorbis/Opus
+    if blocks:
+        try:
+            return Picture(base64.b64decode(blocks[0])).data
+        except (ValueError, mutagen.MutagenError):
+            return None
+    return None
+
+
+class MetadataQueue:
+    """Pending files shared by every worker in a MetadataManager pool.
+
+    One OrderedDict per priority level is used as an ordered set, so enqueue,
+    dedup, pop, reprioritization and per-file removal are all O(1) while the
+    mutex is held. Workers always drain the most urgent non-empty level first.
+    """
+
+    def __init__(self):
+        self._mutex = QMutex()
+        self._levels: List["OrderedDict[str, None]"] = [OrderedDict() for _ in range(PRIORITY_BACKGROUND + 1)]
+        self._priority: Dict[str, int] = {}
+        self._in_flight: Set[str] = set()
+        self._dropped: Set[str] = set()
+        self._active_workers = 0
+        self._cancelled = False
+
+    def add(self, filepath: str, priority: int = PRIORITY_BACKGROUND) -> bool:
+        return self.add_many((filepath,), priority) > 0
+
+    def add_many(self, filepaths: Iterable[str], priority: int = PRIORITY_BACKGROUND) -> int:
+        """Enqueue a batch under a single lock; returns how many were new.
+
+        Files already queued at a less urgent level are promoted to ``priority``.
+        """
+        # Existence is checked by the worker, keeping stat() calls off the GUI thread
+        added = 0
+        with QMutexLocker(self._mutex):
+            for filepath in filepaths:
+                if not filepath:
+                    continue
+                current = self._priority.get(filepath)
+                if current is not None:
+                    if priority < current:
+                        self._move_locked(filepath, current, priority)
+                    continue
+                self._levels[priority][filepath] = None
+                self._priority[filepath] = priority
+                self._dropped.discard(filepath)
+                added += 1
+        return added
+
+    def _move_locked(self, filepath: str, old: int, new: int) -> None:
+        del self._levels[old][filepath]
+        self._levels[new][filepath] = None
+        self._priority[filepath] = new
+
+    def reprioritize(self, filepaths: Iterable[str], priority: int) -> None:
+        """Make ``filepaths`` the only queued files at ``priority``.
+
+        Queued files in the given set move to that level; files left over from
+        a previous call (e.g. rows scrolled out of view) drop back to background.
+        Files that are not queued are ignored.
+        """
+        with QMutexLocker(self._mutex):
+            # Ordered, so upcoming tracks are parsed in play order
+            wanted = dict.fromkeys(filepaths)
+            if priority != PRIORITY_BACKGROUND:
+                for filepath in [f for f in self._levels[priority] if f not in wanted]:
+                    self._move_locked(filepath, priority, PRIORITY_BACKGROUND)
+            for filepath in wanted:
+                current = self._priority.get(filepath)
+                if current is not None and current != priority:
+                    self._move_locked(filepath, current, priority)
+
+    def take(self) -> str | None:
+        """Pop the next file for a worker; None tells the worker to exit."""
+        with QMutexLocker(self._mutex):
+            if not self._cancelled:
+                for level in self._levels:
+                    if level:
+                        filepath, _ = level.popitem(last=False)
+                        del self._priority[filepath]
+                        self._in_flight.add(filepath)
+                        return filepath
+            # Deregister under the lock so add() + reserve_workers() never miss us
+            self._active_workers = max(0, self._active_workers - 1)
+            return None
+
+    def done(self, filepath: str) -> bool:
+        """Mark a file finished; False if its result was cancelled meanwhile."""
+        with QMutexLocker(self._mutex):
+            self._in_flight.discard(filepath)
+            if filepath in self._dropped:
+                self._dropped.discard(filepath)
+                return False
+            return not self._cancelled
+
+    def discard(self, filepath: str) -> None:
+        """Cancel a single file whether it is still pending or already in flight."""
+        with QMutexLocker(self._mutex):
+            current = self._priority.pop(filepath, None)
+            if current is not None:
+                del self._levels[current][filepath]
+            elif filepath in self._in_flight:
+                self._dropped.add(filepath)
+
+    def reserve_workers(self, limit: int) -> int:
+        """Return how many extra workers to start, counting them as active."""
+        with QMutexLocker(self._mutex):
+            wanted = min(limit - self._active_workers, len(self._priority))
+            if self._cancelled or wanted <= 0:
+                return 0
+            self._active_workers += wanted
+            return wanted
+
+    def cancel(self) -> None:
+        with QMutexLocker(self._mutex):
+            self._cancelled = True
+            for level in self._levels:
+                level.clear()
+            self._priority.clear()
+            self._in_flight.clear()
+            self._dropped.clear()
+
+    def __len__(self) -> int:
+        with QMutexLocker(self._mutex):
+            return len(self._priority)
 
 
 class MetadataWorker(QObject):
-    metadata_ready = pyqtSignal(str, dict)  # filepath, metadata
+    metadata_batch_ready = pyqtSignal(list)  # [(filepath, metadata), ...]
     error_occurred = pyqtSignal(str, str)   # filepath, error
     finished = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, queue: MetadataQueue | None = None, cache: MetadataCache | None = None,
+                 batch_size: int = 200, batch_interval_ms: int = 100, fast: bool = True):
         super().__init__()
-        self._queue: List[str] = []
-        self._cancelled = False
-        self._mutex = QMutex()
+        self._cache = cache
+        self.fast = fast
+        self._queue = queue if queue is not None else MetadataQueue()
+        # Results are flushed every batch_size items or batch_interval_ms,
+        # whichever comes first, so the GUI sees a few events per second
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000.0
+        # Parsed results not yet emitted; flush() may drain them from another thread
+        self._batch: List[Tuple[str, Dict[str, Any]]] = []
+        self._batch_mutex = QMutex()
+        self._last_flush = time.monotonic()
 
     def add_file(self, filepath: str):
-        with QMutexLocker(self._mutex):
-            if filepath and os.path.exists(filepath) and filepath not in self._queue:
-                self._queue.append(filepath)
+        self._queue.add(filepath)
+
+    def add_files(self, filepaths: Iterable[str]):
+        self._queue.add_many(filepaths)
 
     def cancel(self):
-        with QMutexLocker(self._mutex):
-            self._cancelled = True
-            self._queue.clear()
+        self._queue.cancel()
+
+    def flush(self) -> None:
+        """Emit the results parsed so far. Thread-safe, so a timer on another
+        thread can deliver them while this worker blocks on a slow file."""
+        with QMutexLocker(self._batch_mutex):
+            batch, self._batch = self._batch, []
+            self._last_flush = time.monotonic()
+        if batch:
+            self.metadata_batch_ready.emit(batch)
 
     def process(self):
         while True:
-            if self._cancelled:
-                break
-
-            filepath = None
-            with QMutexLocker(self._mutex):
-                if self._queue:
-                    filepath = self._queue.pop(0)
-
+            filepath = self._queue.take()
             if filepath is None:
                 break
 
+            if not os.path.exists(filepath):
+                self._queue.done(filepath)
+                continue
+
             try:
                 data = self._extract_metadata(filepath)
-                if not self._cancelled:
-                    self.metadata_ready.emit(filepath, data)
+                if self._cache is not None:
+                    self._cache.put(filepath, data)
+                if self._queue.done(filepath):
+                    with QMutexLocker(self._batch_mutex):
+                        self._batch.append((filepath, data))
+                        due = (len(self._batch) >= self.batch_size
+                               or time.monotonic() - self._last_flush >= self.batch_interval)
+                    if due:
+                        self.flush()
             except Exception as e:
-                if not self._cancelled:
+                if self._queue.done(filepath):
                     self.error_occurred.emit(filepath, str(e))
 
+        self.flush()
+        if self._cache is not None:
+            self._cache.flush()
         self.finished.emit()
 
+    def _open_audio(self, filepath: str):
+        # Fast mode only decodes the frames we display; the duration still
+        # comes from the stream header, never from a full scan
+        if self.fast and filepath.lower().endswith(".mp3"):
+            try:
+                return MP3(filepath, known_frames=_FAST_ID3_FRAMES)
+            except mutagen.MutagenError:
+                # Mislabeled file; let mutagen detect the real format
+                pass
+        return mutagen.File(filepath)
+
     def _extract_metadata(self, filepath: str) -> Dict[str, Any]:
-        audio = mutagen.File(filepath)
+        if self.fast:
+            reader = _FAST_READERS.get(os.path.splitext(filepath)[1].lower())
+            md = reader(filepath) if reader is not None else None
+            if md is not None:
+                return md
+        audio = self._open_audio(filepath)
         if audio is None:
             raise ValueError("Unsupported or unreadable file")
 
@@ -80,78 +306,148 @@ class MetadataWorker(QObject):
 
 
 class MetadataManager:
-    def __init__(self, parent=None):
+    """Runs a pool of MetadataWorkers that drain one shared MetadataQueue.
+
+    Each worker holds at most one file at a time, so the number of files in
+    flight is bounded by ``max_workers``.
+    """
+
+    def __init__(self, parent=None, cache: MetadataCache | None = None, max_workers: int | None = None,
+                 fast: bool = True, batch_interval_ms: int = 100):
         self.parent = parent
-        self.thread: QThread | None = None
-        self.worker: MetadataWorker | None = None
+        self.fast = fast
+        self.max_workers = max(1, max_workers or min(4, os.cpu_count() or 1))
+        self.queue = MetadataQueue()
+        self.workers: List[Tuple[QThread, MetadataWorker]] = []
+        self.cache = cache if cache is not None else self._open_default_cache()
+        # Workers only check their batch deadline between files; this GUI-thread
+        # timer delivers finished results while a worker is stuck on a slow one
+        self._flush_timer = QTimer()
+        self._flush_timer.setInterval(batch_interval_ms)
+        self._flush_timer.timeout.connect(self._flush_workers)
 
-    def _has_live_thread(self) -> bool:
-        # Robustly check if the thread exists and is alive without crashing if deleted
+    @staticmethod
+    def _open_default_cache() -> MetadataCache | None:
+        # A broken or locked cache file must never stop metadata loading
         try:
-            return bool(self.thread) and self.thread.isRunning()
-        except RuntimeError:
-            # QThread wrapper likely deleted
-            return False
+            return MetadataCache()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Metadata cache unavailable: {e}")
+            return None
 
     def start(self):
-        # If previous thread died or was deleted, rebuild fresh
-        if self._has_live_thread():
-            return
+        # Top the pool up to max_workers, but never beyond the pending file count
+        for _ in range(self.queue.reserve_workers(self.max_workers)):
+            self._start_worker()
 
-        # Clear stale references if any
-        self.thread = QThread()
-        self.worker = MetadataWorker()
-        self.worker.moveToThread(self.thread)
+    def _start_worker(self):
+        thread = QThread()
+        worker = MetadataWorker(self.queue, self.cache, fast=self.fast,
+                                batch_interval_ms=self._flush_timer.interval())
+        worker.moveToThread(thread)
 
         # Start processing when thread starts
-        self.thread.started.connect(self.worker.process)
+        thread.started.connect(worker.process)
 
         # Cleanup connections
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self._on_thread_finished)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(lambda t=thread: self._on_thread_finished(t))
 
         # Connect worker -> UI (slots on the GUI thread)
         if self.parent:
-            self.worker.metadata_ready.connect(self.parent.on_metadata_ready)
-            self.worker.error_occurred.connect(self.parent.on_metadata_error)
+            worker.metadata_batch_ready.connect(self._deliver)
+            worker.error_occurred.connect(self.parent.on_metadata_error)
 
-        self.thread.start()
+        self.workers.append((thread, worker))
+        thread.start()
+        self._flush_timer.start()
 
-    def _on_thread_finished(self):
-        # Called in the GUI thread when the thread stops
+    def _flush_workers(self):
+        for _, worker in self.workers:
+            try:
+                worker.flush()
+            except RuntimeError:
+                # Worker already deleted; its thread is about to report finished
+                pass
+
+    def _deliver(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        # Prefer the parent's batched slot; fall back to per-file updates
+        if hasattr(self.parent, "on_metadata_batch_ready"):
+            self.parent.on_metadata_batch_ready(batch)
+        else:
+            for filepath, data in batch:
+                self.parent.on_metadata_ready(filepath, data)
+
+    def _on_thread_finished(self, thread: QThread):
+        # Called in the GUI thread when a pool thread stops
         try:
-            if self.thread:
-                self.thread.deleteLater()
+            thread.deleteLater()
         except RuntimeError:
             pass
-        # Important: drop references so future .add_file() will recreate fresh thread
-        self.thread = None
-        self.worker = None
+        # Drop the pair so future .add_file() calls start a fresh worker
+        self.workers = [(t, w) for t, w in self.workers if t is not thread]
+        if not self.workers:
+            self._flush_timer.stop()
 
-    def add_file(self, filepath: str):
-        # Ensure a live thread/worker exists
-        if not self._has_live_thread():
+    def add_file(self, filepath: str, priority: int = PRIORITY_BACKGROUND):
+        # Warm start: unchanged files are answered from the cache without parsing
+        if self.cache is not None and self.parent:
+            cached = self.cache.get(filepath)
+            if cached is not None:
+                self._deliver([(filepath, cached)])
+                return
+
+        if self.queue.add(filepath, priority):
             self.start()
 
-        # After start, worker/thread should exist; guard in case start failed
-        if self.worker:
-            self.worker.add_file(filepath)
+    def add_files(self, filepaths: Iterable[str], priority: int = PRIORITY_BACKGROUND):
+        """Queue many files at once, taking the queue lock once per batch."""
+        pending = filepaths
+        if self.cache is not None and self.parent:
+            pending = []
+            hits = []
+            for filepath in filepaths:
+                cached = self.cache.get(filepath)
+                if cached is not None:
+                    hits.append((filepath, cached))
+                else:
+                    pending.append(filepath)
+            if hits:
+                self._deliver(hits)
+
+        if self.queue.add_many(pending, priority):
+            self.start()
+
+    def set_now_playing(self, filepath: str | None):
+        """Parse the current track ahead of everything else."""
+        self.queue.reprioritize([filepath] if filepath else [], PRIORITY_NOW_PLAYING)
+
+    def set_visible_files(self, filepaths: Iterable[str]):
+        """Parse rows currently in the playlist viewport next; call on scroll."""
+        self.queue.reprioritize(filepaths, PRIORITY_VISIBLE)
+
+    def set_next_up(self, filepaths: Iterable[str]):
+        """Parse the upcoming tracks in play order before the background backlog."""
+        self.queue.reprioritize(filepaths, PRIORITY_NEXT_UP)
+
+    def cancel_file(self, filepath: str):
+        """Stop extraction of one file; a result already being parsed is dropped."""
+        self.queue.discard(filepath)
 
     def cleanup(self):
         # Graceful shutdown; safe to call multiple times
-        try:
-            if self.worker:
-                self.worker.cancel()
-        except RuntimeError:
-            pass
-        try:
-            if self.thread:
-                self.thread.quit()
-                self.thread.wait(3000)
-        except RuntimeError:
-            pass
+        self._flush_timer.stop()
+        self.queue.cancel()
+        for thread, _ in self.workers:
+            try:
+                thread.quit()
+                thread.wait(3000)
+            except RuntimeError:
+                pass
         # Drop references to avoid stale pointers
-        self.worker = None
-        self.thread = None
-
+        self.workers = []
+        self.queue = MetadataQueue()
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
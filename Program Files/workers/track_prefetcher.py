@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Tuple
+import os
+import threading
+
+# Always read this much of each file so the first second of audio is resident,
+# even where WILLNEED is only advisory (NFS, SMB)
+HEAD_BYTES = 512 * 1024
+
+
+class TrackPrefetcher:
+    """Warms the next few tracks into the OS page cache ahead of playback.
+
+    prefetch() replaces the wanted list; a background thread then works
+    through it in play order. Where the platform has it, the whole file is
+    handed to ``posix_fadvise(WILLNEED)``; elsewhere files are read through a
+    single reusable buffer. Either way, the total bytes requested for the
+    list never exceed ``max_bytes``, and a newer list interrupts the old one
+    between chunks.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, chunk_size: int = 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._buffer = bytearray(chunk_size)
+        self._cond = threading.Condition()
+        self._wanted: List[str] = []
+        self._generation = 0
+        self._closed = False
+        # path -> (size, mtime_ns, bytes warmed) for files in the current window
+        self._warm: Dict[str, Tuple[int, int, int]] = {}
+        self._thread: threading.Thread | None = None
+
+    def prefetch(self, paths: Iterable[str]):
+        """Warm ``paths`` (next-up first), dropping any older request."""
+        with self._cond:
+            if self._closed:
+                return
+            self._wanted = list(paths)
+            self._generation += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="track-prefetch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _stale(self, generation: int) -> bool:
+        return self._closed or generation != self._generation
+
+    def _run(self):
+        done = 0
+        while True:
+            with self._cond:
+                while not self._closed and self._generation == done:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                paths, generation = self._wanted, self._generation
+            self._prefetch(paths, generation)
+            done = generation
+
+    def _prefetch(self, paths: List[str], generation: int):
+        budget = self.max_bytes
+        warm: Dict[str, Tuple[int, int, int]] = {}
+        for path in paths:
+            if budget <= 0 or self._stale(generation):
+                break
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            want = min(st.st_size, budget)
+            known = self._warm.get(path)
+            if known is None or known[:2] != (st.st_size, st.st_mtime_ns) or known[2] < want:
+                want = self._warm_file(path, want, generation)
+            warm[path] = (st.st_size, st.st_mtime_ns, want)
+            budget -= want
+        # Forget files that dropped out of the window; the kernel may evict them
+        self._warm = warm
+
+    def _warm_file(self, path: str, length: int, generation: int) -> int:
+        try:
+            with open(path, "rb", buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    # The kernel reads the span in the background; pull in the head now
+                    os.posix_fadvise(f.fileno(), 0, length, os.POSIX_FADV_WILLNEED)
+                    self._read(f, min(length, HEAD_BYTES), generation)
+                    return length
+                return self._read(f, length, generation)
+        except OSError:
+            return 0
+
+    def _read(self, f, length: int, generation: int) -> int:
+        view = memoryview(self._buffer)
+        done = 0
+        while done < length and not self._stale(generation):
+            n = f.readinto(view[:min(len(view), length - done)])
+            if not n:
+                break
+            done += n
+        return done